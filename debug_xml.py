@@ -8,9 +8,8 @@ from pathlib import Path
 # Add the project root to Python path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from libvirt_mcp_server.libvirt_client import LibvirtClient
-from libvirt_mcp_server.config import Config
 from libvirt_mcp_server.models import DomainCreateParams
+from libvirt_mcp_server.xml_templates import generate_domain_xml
 
 # Define VM parameters
 params = DomainCreateParams(
@@ -24,11 +23,7 @@ params = DomainCreateParams(
     boot_device="hd"
 )
 
-# Load configuration
-config = Config()
-client = LibvirtClient(config)
-
 # Generate XML
-domain_xml = client.generate_domain_xml(params)
+domain_xml = generate_domain_xml(params)
 print("Generated XML:")
 print(domain_xml)
\ No newline at end of file
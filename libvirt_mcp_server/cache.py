@@ -0,0 +1,73 @@
+"""
+In-process caching helpers for libvirt-mcp-server.
+
+This module provides a small time-to-live cache for async callables whose
+results change slowly (host information, network and storage pool
+listings), so repeated tool calls can be served without a libvirt round trip.
+"""
+
+import asyncio
+import functools
+import inspect
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, Tuple
+
+
+# Global cache generation; bumping it invalidates every ttl_cache entry
+_generation = 0
+
+
+def invalidate_ttl_caches() -> None:
+    """Invalidate all entries cached by ttl_cache-decorated functions."""
+    global _generation
+    _generation += 1
+
+
+def ttl_cache(seconds: float, ignore: Iterable[str] = ("ctx",)) -> Callable:
+    """
+    Decorator caching the result of an async function for a fixed time.
+    
+    Results are keyed on the call arguments, excluding the names in
+    ``ignore``. Exceptions are never cached. Entries expire after
+    ``seconds`` (measured with a monotonic clock) or when
+    invalidate_ttl_caches() is called.
+    
+    Args:
+        seconds: Time-to-live of a cached result in seconds
+        ignore: Argument names excluded from the cache key
+    """
+    ignored = frozenset(ignore)
+    
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        entries: Dict[Hashable, Tuple[float, int, Any]] = {}
+        lock = asyncio.Lock()
+        
+        def _make_key(args, kwargs) -> Hashable:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return tuple(
+                (name, value)
+                for name, value in bound.arguments.items()
+                if name not in ignored
+            )
+        
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = _make_key(args, kwargs)
+            
+            async with lock:
+                entry = entries.get(key)
+                if entry is not None:
+                    expiry, generation, value = entry
+                    if generation == _generation and time.monotonic() < expiry:
+                        return value
+                
+                generation = _generation
+                value = await func(*args, **kwargs)
+                entries[key] = (time.monotonic() + seconds, generation, value)
+                return value
+        
+        wrapper.cache_clear = entries.clear
+        return wrapper
+    return decorator
@@ -9,7 +9,6 @@
 - 配置验证
 """
 
-import asyncio
 import os
 import sys
 from pathlib import Path
@@ -23,7 +22,7 @@ from typing_extensions import Annotated
 
 from .config import Config
 from .exceptions import ConfigurationError, LibvirtConnectionError
-from .server import LibvirtMCPServer
+from .server import LibvirtMCPServer, run_event_loop
 from .logging import configure_logging, get_logger, log_startup_info
 
 # 版本信息
@@ -162,7 +161,7 @@ def start(
     启动服务器来处理来自 AI 模型的虚拟化管理请求。
     服务器将通过 MCP 协议暴露 libvirt 功能。
     """
-    asyncio.run(_async_start(
+    run_event_loop(_async_start(
         config=config,
         transport=transport,
         host=host,
@@ -367,7 +366,7 @@ def check_libvirt(
             
             await client.disconnect()
         
-        asyncio.run(check_connection())
+        run_event_loop(check_connection())
         
         console.print("[bold green]✅ Libvirt 连接检查成功！[/bold green]")
         
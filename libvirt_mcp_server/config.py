@@ -12,6 +12,10 @@ from typing import Any, Dict, List, Optional
 import yaml
 from pydantic import BaseModel, Field, validator
 
+# Prefer the libyaml-backed C loader/dumper, falling back to pure Python
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
 
 class LibvirtConfig(BaseModel):
     """Libvirt connection configuration."""
@@ -90,7 +94,7 @@ class Config(BaseModel):
             raise FileNotFoundError(f"Configuration file not found: {file_path}")
         
         with open(path, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
+            data = yaml.load(f, Loader=_YAML_LOADER)
         
         return cls(**data)
 
@@ -166,7 +170,7 @@ class Config(BaseModel):
         path.parent.mkdir(parents=True, exist_ok=True)
         
         with open(path, 'w', encoding='utf-8') as f:
-            yaml.dump(self.dict(), f, default_flow_style=False, indent=2)
+            yaml.dump(self.dict(), f, Dumper=_YAML_DUMPER, default_flow_style=False, indent=2)
 
     def validate_permissions(self) -> bool:
         """Validate that the configuration allows required operations."""
@@ -7,7 +7,15 @@ with proper error handling, connection management, and security controls.
 
 import asyncio
 import contextlib
-from typing import Dict, List, Optional, Union
+import contextvars
+import functools
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
 import xml.etree.ElementTree as ET
 
 import libvirt
@@ -31,10 +39,36 @@ from .models import (
     StoragePoolInfo,
     StoragePoolState,
 )
+from .xml_templates import generate_domain_xml
 
 
 logger = get_logger(__name__)
 
+# Reconnect policy used when the libvirt connection is found dead
+_RECONNECT_ATTEMPTS = 3
+_RECONNECT_DELAY = 0.5  # seconds between attempts
+
+# Dedicated pool for blocking libvirt calls. Kept separate from the loop's
+# default executor so libvirt work does not contend with file I/O; sized to
+# roughly what libvirtd serves concurrently per client (max_client_requests).
+_LIBVIRT_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="libvirt")
+
+
+def _in_libvirt_pool(func: Callable) -> Callable:
+    """
+    Decorator turning a blocking client method into a coroutine.
+    
+    The wrapped method runs in the libvirt thread pool with the caller's
+    context variables, so the event loop stays free while libvirt blocks.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+        return await loop.run_in_executor(_LIBVIRT_POOL, call)
+    
+    return wrapper
+
 
 class LibvirtClient:
     """
@@ -52,6 +86,7 @@ class LibvirtClient:
         self.config = config
         self._connection: Optional[libvirt.virConnect] = None
         self._lock = asyncio.Lock()
+        self._reconnect_lock = threading.Lock()
         
         # Set up libvirt error handler to prevent default stderr output
         libvirt.registerErrorHandler(self._libvirt_error_handler, None)
@@ -77,11 +112,8 @@ class LibvirtClient:
                 return
             
             try:
-                if self.config.libvirt.readonly:
-                    self._connection = libvirt.openReadOnly(self.config.libvirt.uri)
-                else:
-                    self._connection = libvirt.open(self.config.libvirt.uri)
-                
+                loop = asyncio.get_running_loop()
+                self._connection = await loop.run_in_executor(_LIBVIRT_POOL, self._open_connection)
                 logger.info(f"Connected to libvirt: {self.config.libvirt.uri}")
                 
             except libvirtError as e:
@@ -100,19 +132,48 @@ class LibvirtClient:
                 finally:
                     self._connection = None
     
+    def _open_connection(self) -> libvirt.virConnect:
+        """Open a new connection to the configured libvirt URI."""
+        if self.config.libvirt.readonly:
+            return libvirt.openReadOnly(self.config.libvirt.uri)
+        return libvirt.open(self.config.libvirt.uri)
+    
     def _ensure_connected(self) -> libvirt.virConnect:
-        """Ensure we have an active connection."""
+        """Ensure we have an active connection, reconnecting if it was lost."""
         if self._connection is None:
             raise LibvirtConnectionError("Not connected to libvirt")
         
         try:
-            # Test connection by checking if it's alive
-            self._connection.getVersion()
-            return self._connection
+            # isAlive() is answered locally, unlike an RPC such as getVersion()
+            if self._connection.isAlive():
+                return self._connection
         except libvirtError:
-            # Connection is dead, need to reconnect
-            self._connection = None
-            raise LibvirtConnectionError("Libvirt connection lost")
+            pass
+        
+        # Connection is dead; reconnect once even if several pool threads noticed
+        with self._reconnect_lock:
+            if self._connection is not None:
+                with contextlib.suppress(libvirtError):
+                    if self._connection.isAlive():
+                        return self._connection
+                
+                logger.warning("Libvirt connection lost, reconnecting")
+                with contextlib.suppress(libvirtError):
+                    self._connection.close()
+                self._connection = None
+            
+            last_error = None
+            for attempt in range(_RECONNECT_ATTEMPTS):
+                if attempt:
+                    time.sleep(_RECONNECT_DELAY)
+                try:
+                    self._connection = self._open_connection()
+                    logger.info(f"Reconnected to libvirt: {self.config.libvirt.uri}")
+                    return self._connection
+                except libvirtError as e:
+                    last_error = e
+        
+        raise LibvirtConnectionError(f"Libvirt connection lost: {last_error}")
     
     def _check_operation_allowed(self, operation: str) -> None:
         """Check if operation is allowed by security configuration."""
@@ -133,30 +194,46 @@ class LibvirtClient:
         }
         return state_map.get(state, DomainState.NOSTATE)
     
-    async def list_domains(self, include_inactive: bool = True) -> List[DomainInfo]:
-        """List all domains."""
+    def _domain_list_flags(self, include_inactive: bool, state: Optional[str]) -> int:
+        """Translate list filters into virConnectListAllDomains flags."""
+        flags = 0
+        
+        if not include_inactive:
+            flags |= libvirt.VIR_CONNECT_LIST_DOMAINS_ACTIVE
+        
+        if state in ("running", "active"):
+            flags |= libvirt.VIR_CONNECT_LIST_DOMAINS_RUNNING
+        elif state in ("stopped", "inactive"):
+            flags |= libvirt.VIR_CONNECT_LIST_DOMAINS_SHUTOFF
+        
+        return flags
+    
+    @_in_libvirt_pool
+    def list_domains(
+        self,
+        include_inactive: bool = True,
+        state: Optional[str] = None
+    ) -> List[DomainInfo]:
+        """
+        List domains.
+        
+        Args:
+            include_inactive: Whether to include inactive domains
+            state: Optional state filter (running, stopped, active, inactive);
+                filtering is done by libvirt so unmatched domains are never fetched
+        """
         self._check_operation_allowed("domain.list")
         conn = self._ensure_connected()
         
         try:
             domains = []
+            flags = self._domain_list_flags(include_inactive, state)
             
-            # Get active domains
-            for domain_id in conn.listDomainsID():
+            for domain in conn.listAllDomains(flags):
                 try:
-                    domain = conn.lookupByID(domain_id)
                     domains.append(self._get_domain_info(domain))
-                except libvirtError as e:
-                    logger.warning(f"Failed to get domain info for ID {domain_id}: {e}")
-            
-            # Get inactive domains if requested
-            if include_inactive:
-                for domain_name in conn.listDefinedDomains():
-                    try:
-                        domain = conn.lookupByName(domain_name)
-                        domains.append(self._get_domain_info(domain))
-                    except libvirtError as e:
-                        logger.warning(f"Failed to get domain info for {domain_name}: {e}")
+                except LibvirtOperationError as e:
+                    logger.warning(f"Skipping domain while listing: {e}")
             
             logger.info(f"Listed {len(domains)} domains")
             return domains
@@ -185,7 +262,8 @@ class LibvirtClient:
         except libvirtError as e:
             raise LibvirtOperationError(f"Failed to get domain info: {e}")
     
-    async def get_domain_info(self, domain_name: str) -> DomainInfo:
+    @_in_libvirt_pool
+    def get_domain_info(self, domain_name: str) -> DomainInfo:
         """Get information about a specific domain."""
         self._check_operation_allowed("domain.info")
         conn = self._ensure_connected()
@@ -202,7 +280,8 @@ class LibvirtClient:
             logger.error(f"Failed to get domain info for {domain_name}: {e}")
             raise LibvirtOperationError(f"Failed to get domain info: {e}")
     
-    async def start_domain(self, domain_name: str, force: bool = False) -> bool:
+    @_in_libvirt_pool
+    def start_domain(self, domain_name: str, force: bool = False) -> bool:
         """Start a domain."""
         self._check_operation_allowed("domain.start")
         conn = self._ensure_connected()
@@ -230,7 +309,8 @@ class LibvirtClient:
             logger.error(f"Failed to start domain {domain_name}: {e}")
             raise LibvirtOperationError(f"Failed to start domain: {e}")
     
-    async def stop_domain(self, domain_name: str, force: bool = False) -> bool:
+    @_in_libvirt_pool
+    def stop_domain(self, domain_name: str, force: bool = False) -> bool:
         """Stop a domain."""
         self._check_operation_allowed("domain.stop")
         conn = self._ensure_connected()
@@ -259,7 +339,8 @@ class LibvirtClient:
             logger.error(f"Failed to stop domain {domain_name}: {e}")
             raise LibvirtOperationError(f"Failed to stop domain: {e}")
     
-    async def reboot_domain(self, domain_name: str, force: bool = False) -> bool:
+    @_in_libvirt_pool
+    def reboot_domain(self, domain_name: str, force: bool = False) -> bool:
         """Reboot a domain."""
         self._check_operation_allowed("domain.reboot")
         conn = self._ensure_connected()
@@ -281,7 +362,8 @@ class LibvirtClient:
             logger.error(f"Failed to reboot domain {domain_name}: {e}")
             raise LibvirtOperationError(f"Failed to reboot domain: {e}")
     
-    async def get_domain_stats(self, domain_name: str) -> DomainStats:
+    @_in_libvirt_pool
+    def get_domain_stats(self, domain_name: str) -> DomainStats:
         """Get domain performance statistics."""
         self._check_operation_allowed("domain.stats")
         conn = self._ensure_connected()
@@ -382,7 +464,8 @@ class LibvirtClient:
             logger.error(f"Failed to get domain stats for {domain_name}: {e}")
             raise LibvirtOperationError(f"Failed to get domain stats: {e}")
     
-    async def get_host_info(self) -> HostInfo:
+    @_in_libvirt_pool
+    def get_host_info(self) -> HostInfo:
         """Get host system information."""
         self._check_operation_allowed("host.info")
         conn = self._ensure_connected()
@@ -411,7 +494,8 @@ class LibvirtClient:
             logger.error(f"Failed to get host info: {e}")
             raise LibvirtOperationError(f"Failed to get host info: {e}")
     
-    async def list_networks(self) -> List[NetworkInfo]:
+    @_in_libvirt_pool
+    def list_networks(self) -> List[NetworkInfo]:
         """List all networks."""
         self._check_operation_allowed("network.list")
         conn = self._ensure_connected()
@@ -462,7 +546,8 @@ class LibvirtClient:
         except libvirtError as e:
             raise LibvirtOperationError(f"Failed to get network info: {e}")
     
-    async def list_storage_pools(self) -> List[StoragePoolInfo]:
+    @_in_libvirt_pool
+    def list_storage_pools(self) -> List[StoragePoolInfo]:
         """List all storage pools."""
         self._check_operation_allowed("storage.list")
         conn = self._ensure_connected()
@@ -520,7 +605,8 @@ class LibvirtClient:
         except libvirtError as e:
             raise LibvirtOperationError(f"Failed to get storage pool info: {e}")
     
-    async def get_domain_xml(self, domain_name: str) -> str:
+    @_in_libvirt_pool
+    def get_domain_xml(self, domain_name: str) -> str:
         """Get domain XML configuration."""
         self._check_operation_allowed("domain.getxml")
         conn = self._ensure_connected()
@@ -537,7 +623,8 @@ class LibvirtClient:
             logger.error(f"Failed to get domain XML for {domain_name}: {e}")
             raise LibvirtOperationError(f"Failed to get domain XML: {e}")
     
-    async def create_domain(self, xml: str, ephemeral: bool = False, disk_size: Optional[int] = None) -> bool:
+    @_in_libvirt_pool
+    def create_domain(self, xml: str, ephemeral: bool = False, disk_size: Optional[int] = None) -> bool:
         """Create a new domain from XML configuration."""
         self._check_operation_allowed("domain.create")
         conn = self._ensure_connected()
@@ -550,7 +637,7 @@ class LibvirtClient:
                 raise LibvirtOperationError(f"Invalid XML format: {e}")
             
             # Ensure disk images exist before creating domain
-            await self._ensure_disk_images_exist(root, disk_size)
+            self._ensure_disk_images_exist(root, disk_size)
             
             if ephemeral:
                 # Create an ephemeral domain (not persistent)
@@ -567,7 +654,8 @@ class LibvirtClient:
             logger.error(f"Failed to create domain: {e}")
             raise LibvirtOperationError(f"Failed to create domain: {e}")
     
-    async def delete_domain(self, domain_name: str, remove_storage: bool = False, force: bool = False) -> bool:
+    @_in_libvirt_pool
+    def delete_domain(self, domain_name: str, remove_storage: bool = False, force: bool = False) -> bool:
         """Delete a domain and optionally its storage."""
         self._check_operation_allowed("domain.delete")
         conn = self._ensure_connected()
@@ -619,7 +707,6 @@ class LibvirtClient:
                     domain.undefine()
                 
                 # Manually remove storage files if still present
-                import os
                 for path in storage_paths:
                     try:
                         if os.path.exists(path):
@@ -639,7 +726,8 @@ class LibvirtClient:
             logger.error(f"Failed to delete domain {domain_name}: {e}")
             raise LibvirtOperationError(f"Failed to delete domain: {e}")
     
-    async def attach_device(self, domain_name: str, device_xml: str, live: bool = True, persistent: bool = True) -> bool:
+    @_in_libvirt_pool
+    def attach_device(self, domain_name: str, device_xml: str, live: bool = True, persistent: bool = True) -> bool:
         """Attach a device to a domain."""
         self._check_operation_allowed("domain.attach_device")
         conn = self._ensure_connected()
@@ -673,7 +761,8 @@ class LibvirtClient:
             logger.error(f"Failed to attach device to domain {domain_name}: {e}")
             raise LibvirtOperationError(f"Failed to attach device: {e}")
     
-    async def detach_device(self, domain_name: str, device_xml: str, live: bool = True, persistent: bool = True) -> bool:
+    @_in_libvirt_pool
+    def detach_device(self, domain_name: str, device_xml: str, live: bool = True, persistent: bool = True) -> bool:
         """Detach a device from a domain."""
         self._check_operation_allowed("domain.detach_device")
         conn = self._ensure_connected()
@@ -709,16 +798,10 @@ class LibvirtClient:
     
     def generate_domain_xml(self, params: 'DomainCreateParams') -> str:
         """Generate domain XML from parameters."""
-        from .xml_templates import DomainXMLGenerator
-        generator = DomainXMLGenerator()
-        return generator.generate(params)
+        return generate_domain_xml(params)
     
-    async def _ensure_disk_images_exist(self, domain_xml: ET.Element, disk_size: Optional[int] = None) -> None:
+    def _ensure_disk_images_exist(self, domain_xml: ET.Element, disk_size: Optional[int] = None) -> None:
         """Ensure all disk images referenced in the domain XML exist."""
-        import os
-        import subprocess
-        from pathlib import Path
-        
         for disk in domain_xml.findall('.//disk[@device="disk"]'):
             source = disk.find('source')
             if source is not None:
@@ -746,7 +829,7 @@ class LibvirtClient:
                         ]
                         
                         try:
-                            result = subprocess.run(
+                            subprocess.run(
                                 cmd, 
                                 capture_output=True, 
                                 text=True, 
@@ -762,9 +845,6 @@ class LibvirtClient:
     
     async def _validate_file_paths(self, params: 'DomainCreateParams') -> None:
         """Validate that required files exist and directories are accessible."""
-        import os
-        from pathlib import Path
-        
         # Validate CDROM/ISO path if specified
         if params.cdrom_path:
             cdrom_file = Path(params.cdrom_path)
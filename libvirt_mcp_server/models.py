@@ -5,10 +5,17 @@ This module defines Pydantic models for representing libvirt resources
 and MCP tool inputs/outputs with proper validation and serialization.
 """
 
+import re
 from enum import Enum
+from functools import cached_property
 from typing import Dict, List, Optional, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+
+# C0 control characters and DEL; none of them belong in names or paths, and
+# most cannot be represented in XML 1.0 at all
+_CONTROL_CHARS = re.compile(r"[\x00-\x1f\x7f]")
 
 
 class DomainState(str, Enum):
@@ -135,6 +142,26 @@ class DomainCreateParams(BaseModel):
     arch: str = Field(description="Architecture", default="x86_64")
     boot_device: str = Field(description="Boot device", default="hd")
     xml: Optional[str] = Field(description="Custom XML configuration", default=None)
+    
+    @field_validator(
+        "name", "disk_path", "cdrom_path", "network", "os_type", "arch", "boot_device"
+    )
+    @classmethod
+    def reject_control_characters(cls, v: Optional[str]) -> Optional[str]:
+        """Reject control characters in fields copied into domain XML."""
+        if v is not None and _CONTROL_CHARS.search(v):
+            raise ValueError("must not contain control characters")
+        return v
+    
+    @cached_property
+    def memory_str(self) -> str:
+        """Memory size in KB as the decimal string written into domain XML."""
+        return str(self.memory)
+    
+    @cached_property
+    def vcpus_str(self) -> str:
+        """vCPU count as the decimal string written into domain XML."""
+        return str(self.vcpus)
 
 
 class OperationResult(BaseModel):
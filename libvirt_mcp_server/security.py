@@ -6,15 +6,43 @@ to ensure safe operation of the libvirt MCP server.
 """
 
 import asyncio
-import json
 import logging
+import re
 import time
-from typing import Any, Dict, List, Optional
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
 
 from .logging import get_logger
 from .config import Config
 
 
+# Length of the rate-limiting window, in seconds
+_RATE_LIMIT_WINDOW = 60.0
+
+# Path traversal and system path fragments rejected in domain names
+_DANGEROUS_NAME_PATTERN = re.compile(
+    r"\.\./|\.\.\\|/etc/|/proc/|/sys/|\\windows\\", re.IGNORECASE
+)
+
+# Control characters other than tab, newline and carriage return
+_NAME_CONTROL_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# Largest XML document accepted from clients, in characters
+_MAX_XML_SIZE = 1024 * 1024
+
+# Markers of XXE (XML External Entity) payloads, checked against the uppercased input
+_DANGEROUS_XML_PATTERNS = (
+    "<!ENTITY",
+    "<!DOCTYPE",
+    "SYSTEM",
+    "PUBLIC",
+    "file://",
+    "http://",
+    "https://",
+    "ftp://",
+)
+
+
 class AuditLogger:
     """
     Audit logger for tracking all operations and security events.
@@ -23,10 +51,19 @@ class AuditLogger:
     and security-relevant events for compliance and debugging.
     """
     
+    # Parameter names containing any of these (case-insensitively) are redacted
+    _REDACT_KEYS = frozenset({"password", "secret", "token", "key", "auth"})
+    _REDACT_PATTERN = re.compile("|".join(sorted(_REDACT_KEYS)), re.IGNORECASE)
+    
     def __init__(self, config: Config):
         self.config = config
         self.logger = get_logger("libvirt_mcp_server.audit")
     
+    @property
+    def enabled(self) -> bool:
+        """Whether operation audit logging is turned on."""
+        return self.config.security.audit_log
+    
     async def log_operation(
         self,
         operation: str,
@@ -38,7 +75,7 @@ class AuditLogger:
         client_info: Optional[Dict[str, str]] = None
     ) -> None:
         """Log an operation with full details."""
-        if not self.config.security.audit_log:
+        if not self.enabled:
             return
         
         await asyncio.get_event_loop().run_in_executor(
@@ -120,16 +157,20 @@ class AuditLogger:
     
     def _sanitize_parameters(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Remove sensitive data from parameters before logging."""
-        sanitized = {}
-        sensitive_keys = {"password", "secret", "token", "key", "auth"}
+        sanitized: Dict[str, Any] = {}
+        # Walk nested dicts iteratively, filling each copy in place
+        pending = deque([(parameters, sanitized)])
         
-        for key, value in parameters.items():
-            if any(sensitive in key.lower() for sensitive in sensitive_keys):
-                sanitized[key] = "[REDACTED]"
-            elif isinstance(value, dict):
-                sanitized[key] = self._sanitize_parameters(value)
-            else:
-                sanitized[key] = value
+        while pending:
+            source, target = pending.pop()
+            for key, value in source.items():
+                if self._REDACT_PATTERN.search(key):
+                    target[key] = "[REDACTED]"
+                elif isinstance(value, dict):
+                    target[key] = nested = {}
+                    pending.append((value, nested))
+                else:
+                    target[key] = value
         
         return sanitized
     
@@ -167,8 +208,26 @@ class SecurityManager:
     def __init__(self, config: Config):
         self.config = config
         self.audit = AuditLogger(config)
-        self._operation_counts: Dict[str, int] = {}
-        self._last_reset = time.time()
+        # Monotonic timestamps of the operations counted against each
+        # user/operation key, oldest first
+        self._windows: Dict[str, Deque[float]] = {}
+        self._lock = asyncio.Lock()
+    
+    def reset_state(self, config: Optional[Config] = None) -> None:
+        """
+        Forget all rate-limit windows and replace the lock.
+        
+        A fresh lock is created because an asyncio.Lock that has had
+        waiters stays bound to that event loop.
+        
+        Args:
+            config: Configuration to switch to; the current one is kept
+                (and read live) when omitted
+        """
+        if config is not None:
+            self.config = config
+            self.audit.config = config
+        self._windows.clear()
         self._lock = asyncio.Lock()
     
     async def validate_operation(
@@ -226,17 +285,19 @@ class SecurityManager:
         client_info: Optional[Dict[str, str]]
     ) -> bool:
         """Check if operation is within rate limits."""
-        current_time = time.time()
-        
-        # Reset counters every minute
-        if current_time - self._last_reset > 60:
-            self._operation_counts.clear()
-            self._last_reset = current_time
+        now = time.monotonic()
         
         # Count operations per user/operation combination
         key = f"{user or 'anonymous'}:{operation}"
-        current_count = self._operation_counts.get(key, 0)
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = deque()
+        
+        # Forget operations that fell out of the sliding window
+        while window and now - window[0] > _RATE_LIMIT_WINDOW:
+            window.popleft()
         
+        current_count = len(window)
         if current_count >= self.config.security.max_concurrent_ops:
             await self.audit.log_security_event(
                 event_type="rate_limit_exceeded",
@@ -252,7 +313,7 @@ class SecurityManager:
             )
             return False
         
-        self._operation_counts[key] = current_count + 1
+        window.append(now)
         return True
     
     async def log_operation_start(
@@ -261,9 +322,19 @@ class SecurityManager:
         parameters: Dict[str, Any],
         user: Optional[str] = None,
         client_info: Optional[Dict[str, str]] = None
-    ) -> float:
-        """Log the start of an operation and return start time."""
-        start_time = time.time()
+    ) -> int:
+        """
+        Log the start of an operation and return its start time.
+        
+        The returned start time is a time.monotonic_ns() reading, only
+        meaningful as the start_time argument of log_operation_complete.
+        The audit event records the wall-clock start instead.
+        """
+        start_time = time.monotonic_ns()
+        
+        # Skip the executor round trip when nothing would be recorded
+        if not self.audit.enabled:
+            return start_time
         
         await self.audit.log_security_event(
             event_type="operation_started",
@@ -272,7 +343,7 @@ class SecurityManager:
             details={
                 "operation": operation,
                 "parameters": parameters,
-                "start_time": start_time,
+                "start_time": time.time(),
             },
             user=user,
             client_info=client_info,
@@ -286,12 +357,18 @@ class SecurityManager:
         parameters: Dict[str, Any],
         result: Dict[str, Any],
         success: bool,
-        start_time: float,
+        start_time: int,
         user: Optional[str] = None,
         client_info: Optional[Dict[str, str]] = None
     ) -> None:
-        """Log the completion of an operation."""
-        execution_time = time.time() - start_time
+        """
+        Log the completion of an operation.
+        
+        The operation stays counted in its rate-limit window until it
+        ages out; completing it does not free a slot.
+        """
+        if not self.audit.enabled:
+            return
         
         await self.audit.log_operation(
             operation=operation,
@@ -299,15 +376,9 @@ class SecurityManager:
             parameters=parameters,
             result=result,
             success=success,
-            execution_time=execution_time,
+            execution_time=(time.monotonic_ns() - start_time) / 1e9,
             client_info=client_info,
         )
-        
-        # Decrement operation count
-        async with self._lock:
-            key = f"{user or 'anonymous'}:{operation}"
-            if key in self._operation_counts:
-                self._operation_counts[key] = max(0, self._operation_counts[key] - 1)
     
     async def validate_domain_name(self, domain_name: str) -> bool:
         """
@@ -328,21 +399,18 @@ class SecurityManager:
             return False
         
         # Check for path traversal attempts
-        dangerous_patterns = ["../", "..\\", "/etc/", "/proc/", "/sys/", "\\windows\\"]
-        domain_lower = domain_name.lower()
-        
-        for pattern in dangerous_patterns:
-            if pattern in domain_lower:
-                await self.audit.log_security_event(
-                    event_type="suspicious_domain_name",
-                    severity="warning",
-                    message=f"Suspicious domain name pattern detected: {domain_name}",
-                    details={"domain_name": domain_name, "pattern": pattern},
-                )
-                return False
+        match = _DANGEROUS_NAME_PATTERN.search(domain_name)
+        if match:
+            await self.audit.log_security_event(
+                event_type="suspicious_domain_name",
+                severity="warning",
+                message=f"Suspicious domain name pattern detected: {domain_name}",
+                details={"domain_name": domain_name, "pattern": match.group().lower()},
+            )
+            return False
         
         # Check for null bytes and control characters
-        if any(ord(c) < 32 for c in domain_name if c not in "\t\n\r"):
+        if _NAME_CONTROL_CHARS.search(domain_name):
             await self.audit.log_security_event(
                 event_type="invalid_domain_name",
                 severity="warning",
@@ -366,20 +434,19 @@ class SecurityManager:
         if not xml_content:
             return False
         
-        # Check for XXE (XML External Entity) attacks
-        dangerous_xml_patterns = [
-            "<!ENTITY",
-            "<!DOCTYPE",
-            "SYSTEM",
-            "PUBLIC",
-            "file://",
-            "http://",
-            "https://",
-            "ftp://",
-        ]
+        # Check size limits first so oversized input is never scanned
+        if len(xml_content) > _MAX_XML_SIZE:
+            await self.audit.log_security_event(
+                event_type="xml_size_limit_exceeded",
+                severity="warning",
+                message="XML content exceeds size limit",
+                details={"content_length": len(xml_content), "limit": _MAX_XML_SIZE},
+            )
+            return False
         
+        # Check for XXE (XML External Entity) attacks
         xml_upper = xml_content.upper()
-        for pattern in dangerous_xml_patterns:
+        for pattern in _DANGEROUS_XML_PATTERNS:
             if pattern in xml_upper:
                 await self.audit.log_security_event(
                     event_type="suspicious_xml_content",
@@ -389,26 +456,48 @@ class SecurityManager:
                 )
                 return False
         
-        # Check size limits
-        if len(xml_content) > 1024 * 1024:  # 1MB limit
-            await self.audit.log_security_event(
-                event_type="xml_size_limit_exceeded",
-                severity="warning",
-                message="XML content exceeds size limit",
-                details={"content_length": len(xml_content), "limit": 1024 * 1024},
-            )
-            return False
-        
         return True
     
+    def operation_count(self, key: str) -> int:
+        """
+        Return the number of operations counted against a rate-limit key.
+        
+        Reads without taking the lock, which is safe on the event loop
+        thread. Intended for introspection; entries that have aged out of
+        the window are only dropped on that key's next rate-limit check.
+        
+        Args:
+            key: Rate-limit key in "user:operation" form
+        
+        Returns:
+            Number of operations in the key's window
+        """
+        window = self._windows.get(key)
+        return len(window) if window else 0
+    
     async def get_security_summary(self) -> Dict[str, Any]:
-        """Get current security status summary."""
+        """
+        Get current security status summary.
+        
+        ``last_reset`` is the wall-clock time of the oldest operation still
+        counted in any rate-limit window, or now when no operation is.
+        """
         async with self._lock:
+            oldest = min(
+                (window[0] for window in self._windows.values() if window),
+                default=None,
+            )
+            last_reset = time.time()
+            if oldest is not None:
+                last_reset -= time.monotonic() - oldest
             return {
                 "audit_enabled": self.config.security.audit_log,
                 "auth_required": self.config.security.auth_required,
                 "allowed_operations": len(self.config.security.allowed_operations),
                 "max_concurrent_ops": self.config.security.max_concurrent_ops,
-                "current_operation_counts": dict(self._operation_counts),
-                "last_reset": self._last_reset,
+                "current_operation_counts": {
+                    key: len(window) for key, window in self._windows.items() if window
+                },
+                "last_reset": last_reset,
+                "rate_limit_window": _RATE_LIMIT_WINDOW,
             }
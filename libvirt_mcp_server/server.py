@@ -9,7 +9,7 @@ access to virtualization management capabilities.
 import asyncio
 import sys
 from contextlib import asynccontextmanager
-from typing import AsyncIterator, Optional, Dict, Any
+from typing import Any, AsyncIterator, Callable, Coroutine, Dict, Optional
 
 from mcp.server.fastmcp import FastMCP
 
@@ -23,6 +23,35 @@ from .logging import get_logger, LogContext, log_async_performance
 logger = get_logger(__name__)
 
 
+def _fast_loop_factory() -> Optional[Callable[[], asyncio.AbstractEventLoop]]:
+    """Return the uvloop (winloop on Windows) loop constructor, if installed."""
+    try:
+        if sys.platform == "win32":
+            import winloop as fast_loop
+        else:
+            import uvloop as fast_loop
+    except ImportError:
+        return None
+    return fast_loop.new_event_loop
+
+
+def run_event_loop(main: Coroutine[Any, Any, Any]) -> Any:
+    """
+    Run a coroutine to completion, like asyncio.run().
+    
+    Uses uvloop/winloop when available and falls back to the default
+    asyncio event loop otherwise.
+    
+    Args:
+        main: Coroutine to run
+    
+    Returns:
+        The coroutine's result
+    """
+    with asyncio.Runner(loop_factory=_fast_loop_factory()) as runner:
+        return runner.run(main)
+
+
 class LibvirtMCPServer:
     """
     Main MCP server for libvirt virtualization management.
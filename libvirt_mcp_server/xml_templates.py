@@ -5,44 +5,348 @@ This module provides classes to generate standardized XML configurations
 for virtual machines and devices, following libvirt best practices.
 """
 
-import uuid
-from typing import Dict, Optional
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
+import copy
+import os
+import string
+from functools import lru_cache
+from typing import Any, Callable, Mapping, Optional, Tuple
+from xml.sax.saxutils import escape
+
+try:
+    from lxml import etree as ET
+    _HAS_LXML = True
+except ImportError:  # pragma: no cover - depends on installed extras
+    import xml.etree.ElementTree as ET
+    _HAS_LXML = False
 
 from .models import DomainCreateParams
 
 
+# Parameter-free subtrees emitted identically into every domain. They are
+# parsed once at import and deep-copied per use, which is cheaper than both
+# rebuilding them element by element and re-parsing the fragment each time.
+_FEATURES_ELEM = ET.fromstring(
+    '<features><acpi/><apic/><vmport state="off"/></features>'
+)
+_CLOCK_ELEM = ET.fromstring(
+    '<clock offset="utc">'
+    '<timer name="rtc" tickpolicy="catchup"/>'
+    '<timer name="pit" tickpolicy="delay"/>'
+    '<timer name="hpet" present="no"/>'
+    '</clock>'
+)
+_PM_ELEM = ET.fromstring(
+    '<pm><suspend-to-mem enabled="no"/><suspend-to-disk enabled="no"/></pm>'
+)
+_CONSOLE_ELEM = ET.fromstring(
+    '<console type="pty"><target type="serial" port="0"/></console>'
+)
+# Constant children of the domain's main disk
+_DISK_DRIVER_ELEM = ET.fromstring('<driver name="qemu" type="qcow2"/>')
+# Bus 0x01 (PCIe root port index 1), slot must be 0
+_DISK_ADDRESS_ELEM = ET.fromstring(
+    '<address type="pci" domain="0x0000" bus="0x01" slot="0x00" function="0x0"/>'
+)
+
+
+# Fixed domain layout used by DomainXMLGenerator's template fast path. It
+# mirrors, element for element, the tree built by the ElementTree path.
+_DOMAIN_TEMPLATE = """\
+<domain type="kvm">
+  <name>{name}</name>
+  <uuid>{uuid}</uuid>
+  <memory unit="KiB">{memory}</memory>
+  <currentMemory unit="KiB">{memory}</currentMemory>
+  <vcpu placement="static">{vcpus}</vcpu>
+{os}  <features>
+    <acpi/>
+    <apic/>
+    <vmport state="off"/>
+  </features>
+  <cpu mode="host-model" check="partial"/>
+  <clock offset="utc">
+    <timer name="rtc" tickpolicy="catchup"/>
+    <timer name="pit" tickpolicy="delay"/>
+    <timer name="hpet" present="no"/>
+  </clock>
+  <pm>
+    <suspend-to-mem enabled="no"/>
+    <suspend-to-disk enabled="no"/>
+  </pm>
+  <devices>
+    <emulator>{emulator}</emulator>
+    <disk type="file" device="disk">
+      <driver name="qemu" type="qcow2"/>
+      <source file="{disk_path}"/>
+      <target dev="vda" bus="{disk_bus}"/>
+      <address type="pci" domain="0x0000" bus="0x01" slot="0x00" function="0x0"/>
+    </disk>
+    <controller type="pci" index="0" model="pcie-root"/>
+    <controller type="pci" index="1" model="pcie-root-port">
+      <address type="pci" domain="0x0000" bus="0x00" slot="0x02" function="0x0" multifunction="on"/>
+    </controller>
+    <controller type="pci" index="2" model="pcie-root-port">
+      <address type="pci" domain="0x0000" bus="0x00" slot="0x04" function="0x0"/>
+    </controller>
+    <controller type="pci" index="3" model="pcie-root-port">
+      <address type="pci" domain="0x0000" bus="0x00" slot="0x06" function="0x0"/>
+    </controller>
+    <controller type="usb" index="0" model="qemu-xhci" ports="15">
+      <address type="pci" domain="0x0000" bus="0x03" slot="0x00" function="0x0"/>
+    </controller>
+{cdrom}    <interface type="network">
+      <mac address="{mac}"/>
+      <source network="{network}"/>
+      <model type="{network_model}"/>
+      <address type="pci" domain="0x0000" bus="0x02" slot="0x00" function="0x0"/>
+    </interface>
+    <console type="pty">
+      <target type="serial" port="0"/>
+    </console>
+    <input type="tablet" bus="usb"/>
+    <input type="mouse" bus="ps2"/>
+    <input type="keyboard" bus="ps2"/>
+    <graphics type="vnc" port="-1" autoport="yes">
+      <listen type="address"/>
+    </graphics>
+    <sound model="{sound_model}">
+      <address type="pci" domain="0x0000" bus="0x00" slot="0x1b" function="0x0"/>
+    </sound>
+    <video>
+      <model type="{video_model}" ram="65536" vram="65536" vgamem="16384" heads="1" primary="yes"/>
+      <address type="pci" domain="0x0000" bus="0x00" slot="0x01" function="0x0"/>
+    </video>
+    <memballoon model="virtio">
+      <address type="pci" domain="0x0000" bus="0x05" slot="0x00" function="0x0"/>
+    </memballoon>
+  </devices>
+</domain>
+"""
+
+# SATA controller plus CD-ROM drive, only emitted when cdrom_path is set
+_CDROM_TEMPLATE = """\
+    <controller type="sata" index="0">
+      <address type="pci" domain="0x0000" bus="0x00" slot="0x1f" function="0x2"/>
+    </controller>
+    <disk type="file" device="cdrom">
+      <driver name="qemu" type="raw"/>
+      <source file="{path}"/>
+      <target dev="sda" bus="sata"/>
+      <readonly/>
+      <address type="drive" controller="0" bus="0" target="0" unit="0"/>
+    </disk>
+"""
+
+
+def _compile_template(template: str) -> Tuple[Tuple[str, Optional[str]], ...]:
+    """Split a str.format-style template into (literal, field name) pairs once."""
+    return tuple(
+        (literal, field) for literal, field, _, _ in string.Formatter().parse(template)
+    )
+
+
+class _KeepMissingFields(dict):
+    """format_map() mapping that leaves unknown fields in place for later rendering."""
+    
+    def __missing__(self, key: str) -> str:
+        return "{" + key + "}"
+
+
+def _render(compiled: Tuple[Tuple[str, Optional[str]], ...], values: Mapping[str, Any]) -> str:
+    """
+    Render a template compiled by _compile_template.
+    
+    Joins the literal chunks with the field values in one pass, which avoids
+    re-parsing the template string the way str.format does on every call.
+    """
+    parts = []
+    for literal, field in compiled:
+        parts.append(literal)
+        if field is not None:
+            parts.append(str(values[field]))
+    return "".join(parts)
+
+
+_CDROM_PARTS = _compile_template(_CDROM_TEMPLATE)
+
+
+# Entities needed on top of escape() for double-quoted attribute values
+_ATTR_ENTITIES = {'"': "&quot;", "\n": "&#10;", "\r": "&#13;", "\t": "&#09;"}
+
+
+# Every PCI address lives in PCI domain 0. These literals are already
+# interned by the compiler, so they are simply shared, not sys.intern()ed.
+_PCI = "pci"
+_PCI_DOMAIN = "0x0000"
+
+
+# PCIe root ports as (controller index, slot on bus 0x00, multifunction):
+# port 1 for modern devices, port 2 for more devices, port 3 for USB
+_PCI_BRIDGE_SPECS = (
+    ("1", "0x02", "on"),
+    ("2", "0x04", None),
+    ("3", "0x06", None),
+)
+
+
+def _pci_address(parent: ET.Element, bus: str, slot: str, function: str = "0x0", **extra: str) -> ET.Element:
+    """
+    Append a PCI <address> element to ``parent``.
+    
+    Args:
+        parent: Device or controller element receiving the address
+        bus: PCI bus number (e.g. "0x00")
+        slot: PCI slot number
+        function: PCI function number
+        **extra: Additional attributes, e.g. multifunction="on"
+    
+    Returns:
+        The new address element
+    """
+    return ET.SubElement(
+        parent, "address", type=_PCI, domain=_PCI_DOMAIN, bus=bus, slot=slot, function=function, **extra
+    )
+
+
+def _random_mac() -> str:
+    """Generate a random MAC address with the QEMU/KVM OUI prefix."""
+    return "52:54:00:" + os.urandom(3).hex(":")
+
+
+def _uuid_str() -> str:
+    """Generate a random (version 4) UUID string without building a uuid.UUID."""
+    b = bytearray(os.urandom(16))
+    b[6] = (b[6] & 0x0F) | 0x40  # version 4
+    b[8] = (b[8] & 0x3F) | 0x80  # RFC 4122 variant
+    h = b.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def _serialize_xml(element: ET.Element, pretty: bool = False) -> str:
+    """
+    Serialize an element without an XML declaration.
+    
+    libvirt parses XML with libxml2 and ignores inter-element whitespace,
+    so indentation is only worth paying for when a human reads the output.
+    
+    Args:
+        element: Element to serialize
+        pretty: Indent the output
+    
+    Returns:
+        XML string
+    """
+    if not pretty:
+        return ET.tostring(element, encoding='unicode')
+    if _HAS_LXML:
+        return ET.tostring(element, encoding='unicode', xml_declaration=False, pretty_print=True)
+    ET.indent(element, space="  ")
+    return ET.tostring(element, encoding='unicode', xml_declaration=False)
+
+
+# Stands in for the MAC address in cached network device XML
+_MAC_PLACEHOLDER = "{mac}"
+
+
+@lru_cache(maxsize=128)
+def _cached_device_xml(builder: Callable[..., ET.Element], pretty: bool, *args: str) -> str:
+    """Serialize the device element ``builder(*args)``, caching the result."""
+    return _serialize_xml(builder(*args), pretty)
+
+
+def _attr(value: str) -> str:
+    """Escape a user-supplied value for a double-quoted XML attribute."""
+    return escape(value, _ATTR_ENTITIES)
+
+
+@lru_cache(maxsize=64)
+def _os_fragment(arch: str, os_type: str, boot_device: str, machine_type: str, cdrom_first: bool) -> str:
+    """
+    Build the indented <os> block of a domain.
+    
+    Only a handful of distinct combinations occur in practice, so the
+    fragments are cached and shared by every generated domain.
+    
+    Args:
+        arch: Guest architecture
+        os_type: Guest OS type
+        boot_device: Boot device
+        machine_type: Machine type
+        cdrom_first: Boot from CDROM first, then hard disk
+    
+    Returns:
+        The <os> element, indented for a direct child of <domain>
+    """
+    boot_devices = ("cdrom", "hd") if cdrom_first else (boot_device,)
+    boot = "".join(f'    <boot dev="{_attr(dev)}"/>\n' for dev in boot_devices)
+    return (
+        "  <os>\n"
+        f'    <type arch="{_attr(arch)}" machine="{_attr(machine_type)}">{escape(os_type)}</type>\n'
+        f"{boot}"
+        "  </os>\n"
+    )
+
+
 class DomainXMLGenerator:
     """Generator for domain XML configurations."""
     
+    # Default settings; subclasses may override them
+    EMULATOR = "/usr/bin/qemu-system-x86_64"
+    MACHINE_TYPE = "pc-q35-6.2"
+    DISK_BUS = "virtio"
+    NETWORK_MODEL = "virtio"
+    VIDEO_MODEL = "qxl"
+    SOUND_MODEL = "ich6"
+    
+    # Input bus per device type; anything not listed defaults to USB
+    _INPUT_BUS = {"tablet": "usb", "mouse": "ps2", "keyboard": "ps2"}
+    
+    # PCI Address allocation map for Q35 machine type
+    # Bus 0x00 (PCIe Root Complex):
+    #   Slot 0x01: Video device (function 0x0)
+    #   Slot 0x02: PCIe root port controller (function 0x0, multifunction)
+    #   Slot 0x03: IDE controller (function 0x0)
+    #   Slot 0x1b: Sound device (function 0x0) - ICH standard location
+    # Bus 0x01 (PCIe Root Port):
+    #   Slot 0x00: PCIe-to-PCI bridge (function 0x0)
+    #   Slot 0x01: USB controller (function 0x0)
+    # Bus 0x02 (PCIe-to-PCI Bridge):
+    #   Slot 0x01: Disk device (function 0x0)
+    #   Slot 0x02: Network interface (function 0x0)
+    # Bus 0x05: Memory balloon device (function 0x0)
+    
     def __init__(self):
-        """Initialize the generator with default settings."""
-        self.default_settings = {
-            "emulator": "/usr/bin/qemu-system-x86_64",
-            "machine_type": "pc-q35-6.2",
-            "disk_bus": "virtio",
-            "network_model": "virtio",
-            "video_model": "qxl",
-            "sound_model": "ich6",
-        }
-        
-        # PCI Address allocation map for Q35 machine type
-        # Bus 0x00 (PCIe Root Complex):
-        #   Slot 0x01: Video device (function 0x0)
-        #   Slot 0x02: PCIe root port controller (function 0x0, multifunction)
-        #   Slot 0x03: IDE controller (function 0x0)
-        #   Slot 0x1b: Sound device (function 0x0) - ICH standard location
-        # Bus 0x01 (PCIe Root Port):
-        #   Slot 0x00: PCIe-to-PCI bridge (function 0x0)
-        #   Slot 0x01: USB controller (function 0x0)
-        # Bus 0x02 (PCIe-to-PCI Bridge):
-        #   Slot 0x01: Disk device (function 0x0)
-        #   Slot 0x02: Network interface (function 0x0)
-        # Bus 0x05: Memory balloon device (function 0x0)
-    
-    def generate(self, params: DomainCreateParams) -> str:
-        """Generate domain XML from parameters."""
+        """Pre-render the domain template with this generator's defaults."""
+        static_fields = _KeepMissingFields(
+            emulator=self.EMULATOR,
+            disk_bus=self.DISK_BUS,
+            network_model=self.NETWORK_MODEL,
+            sound_model=self.SOUND_MODEL,
+            video_model=self.VIDEO_MODEL,
+        )
+        self._domain_parts = _compile_template(_DOMAIN_TEMPLATE.format_map(static_fields))
+    
+    def generate(self, params: DomainCreateParams, use_template: bool = True, pretty: bool = False) -> str:
+        """
+        Generate domain XML from parameters.
+        
+        Args:
+            params: Domain creation parameters
+            use_template: Fill the fixed domain template instead of building
+                and serializing an element tree
+            pretty: Indent the serialized element tree. Only applies when
+                use_template=False; template output is always indented
+        
+        Returns:
+            Domain XML configuration
+        """
+        if use_template:
+            return self._generate_from_template(params)
+        
+        return _serialize_xml(self._build_tree(params), pretty)
+    
+    def _build_tree(self, params: DomainCreateParams) -> ET.Element:
+        """Build the domain element tree from scratch."""
         # Create root domain element
         domain = ET.Element("domain", type="kvm")
         
@@ -51,18 +355,18 @@ class DomainXMLGenerator:
         name.text = params.name
         
         uuid_elem = ET.SubElement(domain, "uuid")
-        uuid_elem.text = str(uuid.uuid4())
+        uuid_elem.text = _uuid_str()
         
         # Memory configuration
         memory = ET.SubElement(domain, "memory", unit="KiB")
-        memory.text = str(params.memory)
+        memory.text = params.memory_str
         
         current_memory = ET.SubElement(domain, "currentMemory", unit="KiB")
-        current_memory.text = str(params.memory)
+        current_memory.text = params.memory_str
         
         # vCPU configuration
         vcpu = ET.SubElement(domain, "vcpu", placement="static")
-        vcpu.text = str(params.vcpus)
+        vcpu.text = params.vcpus_str
         
         # OS configuration
         os_elem = self._generate_os_config(params)
@@ -89,40 +393,43 @@ class DomainXMLGenerator:
         devices = self._generate_devices(params)
         domain.append(devices)
         
-        return self._prettify_xml(domain)
+        return domain
+    
+    def _generate_from_template(self, params: DomainCreateParams) -> str:
+        """Generate domain XML by filling the fixed domain template."""
+        cdrom = _render(_CDROM_PARTS, {"path": _attr(params.cdrom_path)}) if params.cdrom_path else ""
+        disk_path = params.disk_path or f"/var/lib/libvirt/images/{params.name}.qcow2"
+        
+        return _render(self._domain_parts, {
+            "name": escape(params.name),
+            "uuid": _uuid_str(),
+            "memory": params.memory_str,
+            "vcpus": params.vcpus_str,
+            "os": self._get_os_fragment(params),
+            "disk_path": _attr(disk_path),
+            "cdrom": cdrom,
+            "mac": _random_mac(),
+            "network": _attr(params.network or "default"),
+        })
+    
+    def _get_os_fragment(self, params: DomainCreateParams) -> str:
+        """Return the cached <os> block for the given parameters."""
+        # Boot order - prioritize CDROM if available
+        cdrom_first = bool(params.cdrom_path) and params.boot_device == "hd"
+        return _os_fragment(params.arch, params.os_type, params.boot_device, self.MACHINE_TYPE, cdrom_first)
     
     def _generate_os_config(self, params: DomainCreateParams) -> ET.Element:
         """Generate OS configuration."""
-        os_elem = ET.Element("os")
-        
-        # Type
-        type_elem = ET.SubElement(os_elem, "type", arch=params.arch, machine=self.default_settings["machine_type"])
-        type_elem.text = params.os_type
-        
-        # Boot order - prioritize CDROM if available
-        if params.cdrom_path and params.boot_device == "hd":
-            # Boot from CDROM first, then hard disk
-            boot_cdrom = ET.SubElement(os_elem, "boot", dev="cdrom")
-            boot_hd = ET.SubElement(os_elem, "boot", dev="hd")
-        else:
-            boot = ET.SubElement(os_elem, "boot", dev=params.boot_device)
-        
+        os_elem = ET.fromstring(self._get_os_fragment(params))
+        # Drop the fragment's indentation so compact serialization stays compact
+        os_elem.text = None
+        for child in os_elem:
+            child.tail = None
         return os_elem
     
     def _generate_features(self) -> ET.Element:
         """Generate features configuration."""
-        features = ET.Element("features")
-        
-        # ACPI
-        ET.SubElement(features, "acpi")
-        
-        # APIC
-        ET.SubElement(features, "apic")
-        
-        # VMPort
-        ET.SubElement(features, "vmport", state="off")
-        
-        return features
+        return copy.deepcopy(_FEATURES_ELEM)
     
     def _generate_cpu_config(self, params: DomainCreateParams) -> Optional[ET.Element]:
         """Generate CPU configuration."""
@@ -131,30 +438,11 @@ class DomainXMLGenerator:
     
     def _generate_clock_config(self) -> ET.Element:
         """Generate clock configuration."""
-        clock = ET.Element("clock", offset="utc")
-        
-        # RTC timer
-        rtc_timer = ET.SubElement(clock, "timer", name="rtc", tickpolicy="catchup")
-        
-        # PIT timer
-        pit_timer = ET.SubElement(clock, "timer", name="pit", tickpolicy="delay")
-        
-        # HPET timer
-        hpet_timer = ET.SubElement(clock, "timer", name="hpet", present="no")
-        
-        return clock
+        return copy.deepcopy(_CLOCK_ELEM)
     
     def _generate_pm_config(self) -> ET.Element:
         """Generate power management configuration."""
-        pm = ET.Element("pm")
-        
-        # Suspend to memory
-        suspend_to_mem = ET.SubElement(pm, "suspend-to-mem", enabled="no")
-        
-        # Suspend to disk
-        suspend_to_disk = ET.SubElement(pm, "suspend-to-disk", enabled="no")
-        
-        return pm
+        return copy.deepcopy(_PM_ELEM)
     
     def _generate_devices(self, params: DomainCreateParams) -> ET.Element:
         """Generate devices configuration."""
@@ -162,7 +450,7 @@ class DomainXMLGenerator:
         
         # Emulator
         emulator = ET.SubElement(devices, "emulator")
-        emulator.text = self.default_settings["emulator"]
+        emulator.text = self.EMULATOR
         
         # Disk - always create a disk device
         disk = self._generate_disk_device(params)
@@ -231,21 +519,21 @@ class DomainXMLGenerator:
         disk = ET.Element("disk", type="file", device="disk")
         
         # Driver
-        driver = ET.SubElement(disk, "driver", name="qemu", type="qcow2")
+        disk.append(copy.deepcopy(_DISK_DRIVER_ELEM))
         
         # Source
         if params.disk_path:
-            source = ET.SubElement(disk, "source", file=params.disk_path)
+            ET.SubElement(disk, "source", file=params.disk_path)
         else:
             # Generate default disk path
             disk_path = f"/var/lib/libvirt/images/{params.name}.qcow2"
-            source = ET.SubElement(disk, "source", file=disk_path)
+            ET.SubElement(disk, "source", file=disk_path)
         
         # Target
-        target = ET.SubElement(disk, "target", dev="vda", bus=self.default_settings["disk_bus"])
+        ET.SubElement(disk, "target", dev="vda", bus=self.DISK_BUS)
         
-        # Address - Use bus 0x01 (PCIe root port index 1), slot must be 0
-        address = ET.SubElement(disk, "address", type="pci", domain="0x0000", bus="0x01", slot="0x00", function="0x0")
+        # Address
+        disk.append(copy.deepcopy(_DISK_ADDRESS_ELEM))
         
         return disk
     
@@ -254,19 +542,19 @@ class DomainXMLGenerator:
         disk = ET.Element("disk", type="file", device="cdrom")
         
         # Driver
-        driver = ET.SubElement(disk, "driver", name="qemu", type="raw")
+        ET.SubElement(disk, "driver", name="qemu", type="raw")
         
         # Source
-        source = ET.SubElement(disk, "source", file=params.cdrom_path)
+        ET.SubElement(disk, "source", file=params.cdrom_path)
         
         # Target
-        target = ET.SubElement(disk, "target", dev="sda", bus="sata")
+        ET.SubElement(disk, "target", dev="sda", bus="sata")
         
         # Readonly
-        readonly = ET.SubElement(disk, "readonly")
+        ET.SubElement(disk, "readonly")
         
         # Address - SATA address
-        address = ET.SubElement(disk, "address", type="drive", controller="0", bus="0", target="0", unit="0")
+        ET.SubElement(disk, "address", type="drive", controller="0", bus="0", target="0", unit="0")
         
         return disk
     
@@ -275,7 +563,7 @@ class DomainXMLGenerator:
         controller = ET.Element("controller", type="usb", index="0", model="qemu-xhci", ports="15")
         
         # Address - Use bus 0x03 (PCIe root port index 3)
-        address = ET.SubElement(controller, "address", type="pci", domain="0x0000", bus="0x03", slot="0x00", function="0x0")
+        _pci_address(controller, "0x03", "0x00")
         
         return controller
     
@@ -284,7 +572,7 @@ class DomainXMLGenerator:
         controller = ET.Element("controller", type="sata", index="0")
         
         # Address - Fixed: Q35 machine type requires SATA controller at 0:0:1f.2
-        address = ET.SubElement(controller, "address", type="pci", domain="0x0000", bus="0x00", slot="0x1f", function="0x2")
+        _pci_address(controller, "0x00", "0x1f", function="0x2")
         
         return controller
     
@@ -297,20 +585,11 @@ class DomainXMLGenerator:
         """Generate PCI bridge controllers."""
         bridges = []
         
-        # PCIe root port for modern devices
-        root_port = ET.Element("controller", type="pci", index="1", model="pcie-root-port")
-        address = ET.SubElement(root_port, "address", type="pci", domain="0x0000", bus="0x00", slot="0x02", function="0x0", multifunction="on")
-        bridges.append(root_port)
-        
-        # PCIe root port for more devices  
-        root_port2 = ET.Element("controller", type="pci", index="2", model="pcie-root-port")
-        address = ET.SubElement(root_port2, "address", type="pci", domain="0x0000", bus="0x00", slot="0x04", function="0x0")
-        bridges.append(root_port2)
-        
-        # PCIe root port for USB controller
-        root_port3 = ET.Element("controller", type="pci", index="3", model="pcie-root-port")
-        address = ET.SubElement(root_port3, "address", type="pci", domain="0x0000", bus="0x00", slot="0x06", function="0x0")
-        bridges.append(root_port3)
+        for index, slot, multifunction in _PCI_BRIDGE_SPECS:
+            root_port = ET.Element("controller", type="pci", index=index, model="pcie-root-port")
+            extra = {"multifunction": multifunction} if multifunction else {}
+            _pci_address(root_port, "0x00", slot, **extra)
+            bridges.append(root_port)
         
         return bridges
     
@@ -319,58 +598,44 @@ class DomainXMLGenerator:
         interface = ET.Element("interface", type="network")
         
         # MAC address (auto-generated)
-        mac = ET.SubElement(interface, "mac", address=self._generate_mac_address())
+        ET.SubElement(interface, "mac", address=_random_mac())
         
         # Source network
-        source = ET.SubElement(interface, "source", network=params.network or "default")
+        ET.SubElement(interface, "source", network=params.network or "default")
         
         # Model
-        model = ET.SubElement(interface, "model", type=self.default_settings["network_model"])
+        ET.SubElement(interface, "model", type=self.NETWORK_MODEL)
         
         # Address - Use bus 0x02 (PCIe root port index 2), slot must be 0
-        address = ET.SubElement(interface, "address", type="pci", domain="0x0000", bus="0x02", slot="0x00", function="0x0")
+        _pci_address(interface, "0x02", "0x00")
         
         return interface
     
     def _generate_console_device(self) -> ET.Element:
         """Generate console device configuration."""
-        console = ET.Element("console", type="pty")
-        
-        # Target
-        target = ET.SubElement(console, "target", type="serial", port="0")
-        
-        return console
+        return copy.deepcopy(_CONSOLE_ELEM)
     
     def _generate_input_device(self, device_type: str) -> ET.Element:
         """Generate input device configuration."""
-        # Different input devices require different buses
-        if device_type == "tablet":
-            # Tablet devices should use USB bus
-            input_dev = ET.Element("input", type=device_type, bus="usb")
-        elif device_type in ["mouse", "keyboard"]:
-            # Mouse and keyboard can use PS2 bus
-            input_dev = ET.Element("input", type=device_type, bus="ps2")
-        else:
-            # Default to USB for other devices
-            input_dev = ET.Element("input", type=device_type, bus="usb")
-        
-        return input_dev
+        return ET.Element(
+            "input", type=device_type, bus=self._INPUT_BUS.get(device_type, "usb")
+        )
     
     def _generate_graphics_device(self) -> ET.Element:
         """Generate graphics device configuration."""
         graphics = ET.Element("graphics", type="vnc", port="-1", autoport="yes")
         
         # Listen
-        listen = ET.SubElement(graphics, "listen", type="address")
+        ET.SubElement(graphics, "listen", type="address")
         
         return graphics
     
     def _generate_sound_device(self) -> ET.Element:
         """Generate sound device configuration."""
-        sound = ET.Element("sound", model=self.default_settings["sound_model"])
+        sound = ET.Element("sound", model=self.SOUND_MODEL)
         
         # Address
-        address = ET.SubElement(sound, "address", type="pci", domain="0x0000", bus="0x00", slot="0x1b", function="0x0")
+        _pci_address(sound, "0x00", "0x1b")
         
         return sound
     
@@ -379,10 +644,10 @@ class DomainXMLGenerator:
         video = ET.Element("video")
         
         # Model
-        model = ET.SubElement(video, "model", type=self.default_settings["video_model"], ram="65536", vram="65536", vgamem="16384", heads="1", primary="yes")
+        ET.SubElement(video, "model", type=self.VIDEO_MODEL, ram="65536", vram="65536", vgamem="16384", heads="1", primary="yes")
         
         # Address - Clear PCI address for video device
-        address = ET.SubElement(video, "address", type="pci", domain="0x0000", bus="0x00", slot="0x01", function="0x0")
+        _pci_address(video, "0x00", "0x01")
         
         return video
     
@@ -391,105 +656,119 @@ class DomainXMLGenerator:
         memballoon = ET.Element("memballoon", model="virtio")
         
         # Address
-        address = ET.SubElement(memballoon, "address", type="pci", domain="0x0000", bus="0x05", slot="0x00", function="0x0")
+        _pci_address(memballoon, "0x05", "0x00")
         
         return memballoon
-    
-    def _generate_mac_address(self) -> str:
-        """Generate a random MAC address."""
-        import random
-        
-        # Use QEMU/KVM OUI prefix
-        mac = "52:54:00"
-        
-        for _ in range(3):
-            mac += ":" + "{:02x}".format(random.randint(0, 255))
-        
-        return mac
-    
-    def _prettify_xml(self, element: ET.Element) -> str:
-        """Pretty print XML with proper indentation."""
-        rough_string = ET.tostring(element, encoding='unicode')
-        reparsed = minidom.parseString(rough_string)
-        return reparsed.toprettyxml(indent="  ")[23:]  # Remove XML declaration
 
 
 class DeviceXMLGenerator:
-    """Generator for device XML configurations."""
+    """
+    Generator for device XML configurations.
     
-    def generate_disk_device(self, disk_path: str, target_dev: str = "vdb", bus: str = "virtio") -> str:
+    Device XML is a pure function of the arguments apart from the NIC's
+    MAC address, so serialized devices are cached per argument tuple;
+    network devices are cached with a placeholder MAC that is replaced
+    with a fresh address on every call.
+    """
+    
+    def generate_disk_device(
+        self, disk_path: str, target_dev: str = "vdb", bus: str = "virtio", pretty: bool = False
+    ) -> str:
         """Generate disk device XML."""
+        return _cached_device_xml(self._disk_element, pretty, disk_path, target_dev, bus)
+    
+    def generate_network_device(
+        self, network_name: str = "default", model: str = "virtio", pretty: bool = False
+    ) -> str:
+        """Generate network interface device XML."""
+        xml = _cached_device_xml(self._network_element, pretty, network_name, model)
+        # <mac> precedes <source>, so the first occurrence is the placeholder
+        return xml.replace(_MAC_PLACEHOLDER, _random_mac(), 1)
+    
+    def generate_usb_device(self, vendor_id: str, product_id: str, pretty: bool = False) -> str:
+        """Generate USB device XML."""
+        return _cached_device_xml(self._usb_element, pretty, vendor_id, product_id)
+    
+    def generate_cdrom_device(self, iso_path: str, target_dev: str = "hdc", pretty: bool = False) -> str:
+        """Generate CD-ROM device XML."""
+        return _cached_device_xml(self._cdrom_element, pretty, iso_path, target_dev)
+    
+    @staticmethod
+    def _disk_element(disk_path: str, target_dev: str, bus: str) -> ET.Element:
+        """Build a disk device element."""
         disk = ET.Element("disk", type="file", device="disk")
         
         # Driver
-        driver = ET.SubElement(disk, "driver", name="qemu", type="qcow2")
+        ET.SubElement(disk, "driver", name="qemu", type="qcow2")
         
         # Source
-        source = ET.SubElement(disk, "source", file=disk_path)
+        ET.SubElement(disk, "source", file=disk_path)
         
         # Target
-        target = ET.SubElement(disk, "target", dev=target_dev, bus=bus)
+        ET.SubElement(disk, "target", dev=target_dev, bus=bus)
         
-        return self._prettify_xml(disk)
+        return disk
     
-    def generate_network_device(self, network_name: str = "default", model: str = "virtio") -> str:
-        """Generate network interface device XML."""
+    @staticmethod
+    def _network_element(network_name: str, model: str) -> ET.Element:
+        """Build a network interface element with a placeholder MAC address."""
         interface = ET.Element("interface", type="network")
         
-        # MAC address (auto-generated)
-        mac = ET.SubElement(interface, "mac", address=self._generate_mac_address())
+        # MAC address (filled in per call)
+        ET.SubElement(interface, "mac", address=_MAC_PLACEHOLDER)
         
         # Source network
-        source = ET.SubElement(interface, "source", network=network_name)
+        ET.SubElement(interface, "source", network=network_name)
         
         # Model
-        model_elem = ET.SubElement(interface, "model", type=model)
+        ET.SubElement(interface, "model", type=model)
         
-        return self._prettify_xml(interface)
+        return interface
     
-    def generate_usb_device(self, vendor_id: str, product_id: str) -> str:
-        """Generate USB device XML."""
+    @staticmethod
+    def _usb_element(vendor_id: str, product_id: str) -> ET.Element:
+        """Build a USB host device element."""
         hostdev = ET.Element("hostdev", mode="subsystem", type="usb", managed="yes")
         
         # Source
         source = ET.SubElement(hostdev, "source")
-        vendor = ET.SubElement(source, "vendor", id=vendor_id)
-        product = ET.SubElement(source, "product", id=product_id)
+        ET.SubElement(source, "vendor", id=vendor_id)
+        ET.SubElement(source, "product", id=product_id)
         
-        return self._prettify_xml(hostdev)
+        return hostdev
     
-    def generate_cdrom_device(self, iso_path: str, target_dev: str = "hdc") -> str:
-        """Generate CD-ROM device XML."""
+    @staticmethod
+    def _cdrom_element(iso_path: str, target_dev: str) -> ET.Element:
+        """Build a CD-ROM device element."""
         disk = ET.Element("disk", type="file", device="cdrom")
         
         # Driver
-        driver = ET.SubElement(disk, "driver", name="qemu", type="raw")
+        ET.SubElement(disk, "driver", name="qemu", type="raw")
         
         # Source
-        source = ET.SubElement(disk, "source", file=iso_path)
+        ET.SubElement(disk, "source", file=iso_path)
         
         # Target
-        target = ET.SubElement(disk, "target", dev=target_dev, bus="ide")
+        ET.SubElement(disk, "target", dev=target_dev, bus="ide")
         
         # Readonly
-        readonly = ET.SubElement(disk, "readonly")
+        ET.SubElement(disk, "readonly")
         
-        return self._prettify_xml(disk)
+        return disk
+
+
+# Process-wide generator so the compiled template and fragment caches are shared
+_default_generator = DomainXMLGenerator()
+
+
+def generate_domain_xml(params: DomainCreateParams) -> str:
+    """
+    Generate domain XML using the shared DomainXMLGenerator instance.
     
-    def _generate_mac_address(self) -> str:
-        """Generate a random MAC address."""
-        import random
+    Args:
+        params: Domain creation parameters
         
-        # Use QEMU/KVM OUI prefix
-        mac = "52:54:00"
-        
-        for _ in range(3):
-            mac += ":" + "{:02x}".format(random.randint(0, 255))
-        
-        return mac
-    
-    def _prettify_xml(self, element: ET.Element) -> str:
-        """Pretty print XML with proper indentation."""
-        rough_string = ET.tostring(element, encoding='unicode')
-        reparsed = minidom.parseString(rough_string)
-        return reparsed.toprettyxml(indent="  ")[23:]  # Remove XML declaration
\ No newline at end of file
+    Returns:
+        Domain XML string (indented, from the domain template)
+    """
+    return _default_generator.generate(params)
@@ -6,7 +6,6 @@ This script provides a convenient way to run the server during development
 with various configuration options.
 """
 
-import asyncio
 import sys
 from pathlib import Path
 
@@ -15,6 +14,7 @@ project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
 from libvirt_mcp_server import LibvirtMCPServer
+from libvirt_mcp_server.server import run_event_loop
 from libvirt_mcp_server.config import Config
 from libvirt_mcp_server.logging import configure_logging, get_logger
 
@@ -71,4 +71,4 @@ async def main():
 
 if __name__ == "__main__":
     # Run the server
-    asyncio.run(main())
+    run_event_loop(main())
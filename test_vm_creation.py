@@ -12,6 +12,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 from libvirt_mcp_server.config import Config
 from libvirt_mcp_server.libvirt_client import LibvirtClient
 from libvirt_mcp_server.models import DomainCreateParams
+from libvirt_mcp_server.xml_templates import generate_domain_xml
 
 
 async def test_vm_creation():
@@ -60,7 +61,7 @@ async def test_vm_creation():
         print("✅ File paths validated")
         
         # Generate XML
-        domain_xml = client.generate_domain_xml(params)
+        domain_xml = generate_domain_xml(params)
         print("✅ Domain XML generated")
         
         # Create the domain
@@ -0,0 +1,76 @@
+"""Tests for in-process caching helpers."""
+
+import pytest
+
+from libvirt_mcp_server import cache
+from libvirt_mcp_server.cache import invalidate_ttl_caches, ttl_cache
+
+
+class TestTTLCache:
+    """Tests for the ttl_cache decorator."""
+    
+    @pytest.mark.asyncio
+    async def test_returns_cached_value(self):
+        """Test repeated calls within the TTL are served from cache."""
+        calls = []
+        
+        @ttl_cache(seconds=60)
+        async def fetch(ctx, name="default"):
+            calls.append(name)
+            return {"name": name}
+        
+        assert await fetch(ctx=object()) == {"name": "default"}
+        assert await fetch(ctx=object()) == {"name": "default"}
+        assert calls == ["default"]
+        
+        # Different arguments get their own entry
+        await fetch(ctx=object(), name="other")
+        assert calls == ["default", "other"]
+    
+    @pytest.mark.asyncio
+    async def test_expiry(self, monkeypatch):
+        """Test entries are refreshed once the TTL has elapsed."""
+        now = [1000.0]
+        monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+        calls = []
+        
+        @ttl_cache(seconds=30)
+        async def fetch(ctx):
+            calls.append(now[0])
+            return len(calls)
+        
+        assert await fetch(ctx=None) == 1
+        now[0] += 29
+        assert await fetch(ctx=None) == 1
+        now[0] += 2
+        assert await fetch(ctx=None) == 2
+    
+    @pytest.mark.asyncio
+    async def test_invalidate(self):
+        """Test invalidate_ttl_caches drops cached results."""
+        calls = []
+        
+        @ttl_cache(seconds=60)
+        async def fetch(ctx):
+            calls.append(1)
+            return len(calls)
+        
+        assert await fetch(ctx=None) == 1
+        invalidate_ttl_caches()
+        assert await fetch(ctx=None) == 2
+    
+    @pytest.mark.asyncio
+    async def test_exceptions_not_cached(self):
+        """Test failed calls are retried rather than cached."""
+        calls = []
+        
+        @ttl_cache(seconds=60)
+        async def fetch(ctx):
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+            return "ok"
+        
+        with pytest.raises(RuntimeError):
+            await fetch(ctx=None)
+        assert await fetch(ctx=None) == "ok"
@@ -1,13 +1,12 @@
 """Tests for configuration management."""
 
-import os
-import tempfile
 from pathlib import Path
 
 import pytest
 import yaml
 from pydantic import ValidationError
 
+from libvirt_mcp_server import config as config_module
 from libvirt_mcp_server.config import (
     Config,
     LibvirtConfig,
@@ -17,12 +16,44 @@ from libvirt_mcp_server.config import (
 )
 
 
+# Default instances are built once per module; tests that mutate a config
+# work on a deep copy instead.
+@pytest.fixture(scope="module")
+def default_libvirt_config():
+    """Default LibvirtConfig."""
+    return LibvirtConfig()
+
+
+@pytest.fixture(scope="module")
+def default_mcp_config():
+    """Default MCPConfig."""
+    return MCPConfig()
+
+
+@pytest.fixture(scope="module")
+def default_security_config():
+    """Default SecurityConfig."""
+    return SecurityConfig()
+
+
+@pytest.fixture(scope="module")
+def default_logging_config():
+    """Default LoggingConfig."""
+    return LoggingConfig()
+
+
+@pytest.fixture(scope="module")
+def default_config():
+    """Default Config."""
+    return Config()
+
+
 class TestLibvirtConfig:
     """Tests for LibvirtConfig."""
     
-    def test_default_config(self):
+    def test_default_config(self, default_libvirt_config):
         """Test default configuration values."""
-        config = LibvirtConfig()
+        config = default_libvirt_config
         assert config.uri == "qemu:///system"
         assert config.timeout == 30
         assert config.readonly is False
@@ -37,63 +68,39 @@ class TestLibvirtConfig:
         assert config.uri == "qemu:///system"
         assert config.timeout == 60
         assert config.readonly is True
-    
-    def test_timeout_validation(self):
-        """Test timeout validation."""
-        with pytest.raises(ValidationError):
-            LibvirtConfig(timeout=0)
-        
-        with pytest.raises(ValidationError):
-            LibvirtConfig(timeout=500)
 
 
 class TestMCPConfig:
     """Tests for MCPConfig."""
     
-    def test_default_config(self):
+    def test_default_config(self, default_mcp_config):
         """Test default configuration values."""
-        config = MCPConfig()
+        config = default_mcp_config
         assert config.server_name == "libvirt-manager"
         assert config.version == "1.0.0"
         assert config.host == "127.0.0.1"
         assert config.port == 8000
         assert config.transport == "stdio"
-    
-    def test_port_validation(self):
-        """Test port validation."""
-        with pytest.raises(ValidationError):
-            MCPConfig(port=0)
-        
-        with pytest.raises(ValidationError):
-            MCPConfig(port=70000)
 
 
 class TestSecurityConfig:
     """Tests for SecurityConfig."""
     
-    def test_default_config(self):
+    def test_default_config(self, default_security_config):
         """Test default configuration values."""
-        config = SecurityConfig()
+        config = default_security_config
         assert config.auth_required is True
         assert config.audit_log is True
         assert len(config.allowed_operations) > 0
         assert "domain.list" in config.allowed_operations
-    
-    def test_max_concurrent_ops_validation(self):
-        """Test max concurrent operations validation."""
-        with pytest.raises(ValidationError):
-            SecurityConfig(max_concurrent_ops=0)
-        
-        with pytest.raises(ValidationError):
-            SecurityConfig(max_concurrent_ops=200)
 
 
 class TestLoggingConfig:
     """Tests for LoggingConfig."""
     
-    def test_default_config(self):
+    def test_default_config(self, default_logging_config):
         """Test default configuration values."""
-        config = LoggingConfig()
+        config = default_logging_config
         assert config.level == "INFO"
         assert config.file is None
         assert "%(asctime)s" in config.format
@@ -112,18 +119,35 @@ class TestLoggingConfig:
             LoggingConfig(level="INVALID")
 
 
+class TestFieldBounds:
+    """Tests for numeric field bounds across config sections."""
+    
+    @pytest.mark.parametrize("cls, kwargs", [
+        (LibvirtConfig, {"timeout": 0}),
+        (LibvirtConfig, {"timeout": 500}),
+        (MCPConfig, {"port": 0}),
+        (MCPConfig, {"port": 70000}),
+        (SecurityConfig, {"max_concurrent_ops": 0}),
+        (SecurityConfig, {"max_concurrent_ops": 200}),
+    ])
+    def test_out_of_range_rejected(self, cls, kwargs):
+        """Test out-of-range values are rejected."""
+        with pytest.raises(ValidationError):
+            cls(**kwargs)
+
+
 class TestConfig:
     """Tests for main Config class."""
     
-    def test_default_config(self):
+    def test_default_config(self, default_config):
         """Test default configuration."""
-        config = Config()
+        config = default_config
         assert isinstance(config.libvirt, LibvirtConfig)
         assert isinstance(config.mcp, MCPConfig)
         assert isinstance(config.security, SecurityConfig)
         assert isinstance(config.logging, LoggingConfig)
     
-    def test_from_yaml_file(self):
+    def test_from_yaml_file(self, tmp_path):
         """Test loading from YAML file."""
         config_data = {
             "libvirt": {"uri": "qemu:///system", "timeout": 60},
@@ -132,27 +156,25 @@ class TestConfig:
             "logging": {"level": "DEBUG"}
         }
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_path = f.name
+        path = tmp_path / "config.yaml"
+        path.write_text(yaml.safe_dump(config_data))
         
-        try:
-            config = Config.from_yaml_file(temp_path)
-            assert config.libvirt.uri == "qemu:///system"
-            assert config.libvirt.timeout == 60
-            assert config.mcp.server_name == "test-server"
-            assert config.mcp.port == 9000
-            assert config.security.auth_required is False
-            assert config.logging.level == "DEBUG"
-        finally:
-            os.unlink(temp_path)
+        config = Config.from_yaml_file(str(path))
+        assert config.libvirt.uri == "qemu:///system"
+        assert config.libvirt.timeout == 60
+        assert config.mcp.server_name == "test-server"
+        assert config.mcp.port == 9000
+        assert config.security.auth_required is False
+        assert config.logging.level == "DEBUG"
+        if yaml.__with_libyaml__:
+            assert config_module._YAML_LOADER is yaml.CSafeLoader
     
     def test_from_yaml_file_not_found(self):
         """Test loading from non-existent YAML file."""
         with pytest.raises(FileNotFoundError):
             Config.from_yaml_file("/nonexistent/config.yaml")
     
-    def test_from_env(self):
+    def test_from_env(self, monkeypatch):
         """Test loading from environment variables."""
         env_vars = {
             "LIBVIRT_URI": "qemu:///system",
@@ -168,78 +190,63 @@ class TestConfig:
             "MCP_LOG_FILE": "/tmp/test.log"
         }
         
-        # Set environment variables
+        # Set environment variables; monkeypatch restores them on teardown
         for key, value in env_vars.items():
-            os.environ[key] = value
+            monkeypatch.setenv(key, value)
         
-        try:
-            config = Config.from_env()
-            assert config.libvirt.uri == "qemu:///system"
-            assert config.libvirt.timeout == 45
-            assert config.libvirt.readonly is True
-            assert config.mcp.server_name == "env-server"
-            assert config.mcp.host == "0.0.0.0"
-            assert config.mcp.port == 8080
-            assert config.mcp.transport == "http"
-            assert config.security.auth_required is False
-            assert config.security.audit_log is True
-            assert config.logging.level == "WARNING"
-            assert config.logging.file == "/tmp/test.log"
-        finally:
-            # Clean up environment variables
-            for key in env_vars:
-                os.environ.pop(key, None)
-    
-    def test_load_with_file_and_env(self):
+        config = Config.from_env()
+        assert config.libvirt.uri == "qemu:///system"
+        assert config.libvirt.timeout == 45
+        assert config.libvirt.readonly is True
+        assert config.mcp.server_name == "env-server"
+        assert config.mcp.host == "0.0.0.0"
+        assert config.mcp.port == 8080
+        assert config.mcp.transport == "http"
+        assert config.security.auth_required is False
+        assert config.security.audit_log is True
+        assert config.logging.level == "WARNING"
+        assert config.logging.file == "/tmp/test.log"
+    
+    def test_load_with_file_and_env(self, monkeypatch, tmp_path):
         """Test loading with both file and environment variables."""
         config_data = {
             "libvirt": {"uri": "qemu:///system", "timeout": 30},
             "mcp": {"server_name": "file-server", "port": 8000},
         }
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_path = f.name
+        path = tmp_path / "config.yaml"
+        path.write_text(yaml.safe_dump(config_data))
         
         # Set environment variable that should override file
-        os.environ["MCP_SERVER_NAME"] = "env-server"
-        os.environ["MCP_PORT"] = "9000"
+        monkeypatch.setenv("MCP_SERVER_NAME", "env-server")
+        monkeypatch.setenv("MCP_PORT", "9000")
         
-        try:
-            config = Config.load(temp_path)
-            assert config.libvirt.uri == "qemu:///system"  # From file
-            assert config.mcp.server_name == "env-server"  # From env (override)
-            assert config.mcp.port == 9000  # From env (override)
-        finally:
-            os.unlink(temp_path)
-            os.environ.pop("MCP_SERVER_NAME", None)
-            os.environ.pop("MCP_PORT", None)
+        config = Config.load(str(path))
+        assert config.libvirt.uri == "qemu:///system"  # From file
+        assert config.mcp.server_name == "env-server"  # From env (override)
+        assert config.mcp.port == 9000  # From env (override)
     
-    def test_to_yaml_file(self):
+    def test_to_yaml_file(self, default_config, tmp_path):
         """Test saving to YAML file."""
-        config = Config()
+        config = default_config.model_copy(deep=True)
         config.libvirt.uri = "qemu:///system"
         config.mcp.server_name = "test-server"
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            temp_path = f.name
+        path = tmp_path / "out.yaml"
+        config.to_yaml_file(str(path))
+        
+        # Load and verify
+        data = yaml.safe_load(path.read_text())
         
-        try:
-            config.to_yaml_file(temp_path)
-            
-            # Load and verify
-            with open(temp_path, 'r') as f:
-                data = yaml.safe_load(f)
-            
-            assert data["libvirt"]["uri"] == "qemu:///system"
-            assert data["mcp"]["server_name"] == "test-server"
-        finally:
-            os.unlink(temp_path)
+        assert data["libvirt"]["uri"] == "qemu:///system"
+        assert data["mcp"]["server_name"] == "test-server"
+        if yaml.__with_libyaml__:
+            assert config_module._YAML_DUMPER is yaml.CSafeDumper
     
-    def test_validate_permissions(self):
+    def test_validate_permissions(self, default_config):
         """Test permissions validation."""
         # Valid config should pass
-        config = Config()
+        config = default_config.model_copy(deep=True)
         assert config.validate_permissions() is True
         
         # Config missing required operations should fail
@@ -9,13 +9,16 @@
 """
 
 import pytest
+import re
+import uuid
 import xml.etree.ElementTree as ET
+from functools import lru_cache
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from libvirt_mcp_server.libvirt_client import LibvirtClient
 from libvirt_mcp_server.xml_templates import DomainXMLGenerator, DeviceXMLGenerator
 from libvirt_mcp_server.models import DomainCreateParams
-from libvirt_mcp_server.config import Config
 from libvirt_mcp_server.exceptions import (
     LibvirtOperationError,
     LibvirtResourceNotFoundError,
@@ -25,18 +28,17 @@ from libvirt_mcp_server.exceptions import (
 
 @pytest.fixture
 def mock_config():
-    """创建模拟配置对象。"""
-    config = MagicMock(spec=Config)
-    config.libvirt.uri = "test:///default"
-    config.libvirt.readonly = False
-    config.security.allowed_operations = [
-        "domain.create",
-        "domain.delete", 
-        "domain.attach_device",
-        "domain.detach_device",
-        "domain.getxml"
-    ]
-    return config
+    """创建模拟配置对象（只包含 LibvirtClient 读取的属性）。"""
+    return SimpleNamespace(
+        libvirt=SimpleNamespace(uri="test:///default", readonly=False),
+        security=SimpleNamespace(allowed_operations=[
+            "domain.create",
+            "domain.delete", 
+            "domain.attach_device",
+            "domain.detach_device",
+            "domain.getxml"
+        ]),
+    )
 
 
 @pytest.fixture
@@ -45,13 +47,31 @@ def libvirt_client(mock_config):
     return LibvirtClient(mock_config)
 
 
+_DOMAIN_GENERATOR = DomainXMLGenerator()
+_DEVICE_GENERATOR = DeviceXMLGenerator()
+
+
+@lru_cache(maxsize=None)
+def _gen_and_parse(kind, *args, **kwargs):
+    """
+    生成 XML 并解析，按参数缓存结果。
+    
+    kind 为 "domain" 时 args[0] 是 DomainCreateParams.model_dump_json() 的结果，
+    否则为 DeviceXMLGenerator 的方法名。解析结果在测试间共享，测试只能读取。
+    """
+    if kind == "domain":
+        params = DomainCreateParams.model_validate_json(args[0])
+        xml = _DOMAIN_GENERATOR.generate(params, **kwargs)
+    else:
+        xml = getattr(_DEVICE_GENERATOR, kind)(*args, **kwargs)
+    return xml, ET.fromstring(xml)
+
+
 class TestDomainXMLGenerator:
     """测试虚拟机 XML 生成器。"""
     
     def test_generate_basic_domain_xml(self):
         """测试基本虚拟机 XML 生成。"""
-        generator = DomainXMLGenerator()
-        
         params = DomainCreateParams(
             name="test-vm",
             memory=2097152,  # 2GB
@@ -59,10 +79,8 @@ class TestDomainXMLGenerator:
             network="default"
         )
         
-        xml = generator.generate(params)
-        
         # 验证 XML 格式正确
-        root = ET.fromstring(xml)
+        _, root = _gen_and_parse("domain", params.model_dump_json())
         assert root.tag == "domain"
         assert root.get("type") == "kvm"
         
@@ -80,8 +98,6 @@ class TestDomainXMLGenerator:
     
     def test_generate_domain_xml_with_custom_disk(self):
         """测试带自定义磁盘的虚拟机 XML 生成。"""
-        generator = DomainXMLGenerator()
-        
         params = DomainCreateParams(
             name="test-vm-disk",
             memory=1048576,
@@ -89,30 +105,110 @@ class TestDomainXMLGenerator:
             disk_path="/custom/path/disk.qcow2"
         )
         
-        xml = generator.generate(params)
-        root = ET.fromstring(xml)
+        _, root = _gen_and_parse("domain", params.model_dump_json())
         
         # 验证磁盘配置
         disk = root.find(".//disk[@device='disk']")
         assert disk is not None
         source = disk.find("source")
         assert source.get("file") == "/custom/path/disk.qcow2"
+    
+    def test_template_matches_element_tree(self):
+        """测试模板生成与 ElementTree 生成的 XML 一致。"""
+        generator = DomainXMLGenerator()
+        
+        params = DomainCreateParams(
+            name="test-vm-cdrom",
+            memory=1048576,
+            vcpus=2,
+            cdrom_path="/var/lib/libvirt/images/test.iso"
+        )
+        
+        def normalize(xml):
+            # UUID 和 MAC 地址为随机值，比较前清空
+            root = ET.fromstring(xml)
+            root.find("uuid").text = ""
+            root.find(".//interface/mac").set("address", "")
+            return ET.canonicalize(ET.tostring(root, encoding="unicode"), strip_text=True)
+        
+        assert normalize(generator.generate(params)) == normalize(
+            generator.generate(params, use_template=False)
+        )
+    
+    def test_template_escapes_user_fields(self):
+        """测试模板生成对用户输入进行转义。"""
+        params = DomainCreateParams(
+            name='vm<&>"',
+            memory=1048576,
+            vcpus=1,
+            disk_path='/tmp/a"b&c.qcow2'
+        )
+        
+        _, root = _gen_and_parse("domain", params.model_dump_json())
+        assert root.find("name").text == 'vm<&>"'
+        assert root.find(".//disk/source").get("file") == '/tmp/a"b&c.qcow2'
+    
+    def test_generated_uuid_is_version4(self):
+        """测试生成的 UUID 为合法的版本 4 UUID。"""
+        generator = DomainXMLGenerator()
+        params = DomainCreateParams(name="test-vm", memory=1048576, vcpus=1)
+        
+        for use_template in (True, False):
+            root = ET.fromstring(generator.generate(params, use_template=use_template))
+            domain_uuid = uuid.UUID(root.find("uuid").text)
+            assert domain_uuid.version == 4
+            assert domain_uuid.variant == uuid.RFC_4122
 
 
 class TestDeviceXMLGenerator:
     """测试设备 XML 生成器。"""
     
+    @pytest.mark.parametrize("method, kwargs, expected", [
+        (
+            "generate_disk_device",
+            {"disk_path": "/var/lib/libvirt/images/test.qcow2", "target_dev": "vdb", "bus": "virtio"},
+            ['<disk type="file" device="disk">', 'file="/var/lib/libvirt/images/test.qcow2"',
+             'dev="vdb"', 'bus="virtio"'],
+        ),
+        (
+            "generate_network_device",
+            {"network_name": "bridge0", "model": "e1000"},
+            ['<interface type="network">', 'network="bridge0"', '<model type="e1000"'],
+        ),
+        (
+            "generate_usb_device",
+            {"vendor_id": "0x1234", "product_id": "0x5678"},
+            ['<hostdev mode="subsystem" type="usb"', '<vendor id="0x1234"', '<product id="0x5678"'],
+        ),
+        (
+            "generate_cdrom_device",
+            {"iso_path": "/var/lib/libvirt/images/ubuntu.iso", "target_dev": "hdc"},
+            ['<disk type="file" device="cdrom">', 'file="/var/lib/libvirt/images/ubuntu.iso"',
+             'dev="hdc"', 'bus="ide"', "<readonly"],
+        ),
+    ])
+    def test_device_xml_contains(self, method, kwargs, expected):
+        """测试设备 XML 包含关键属性（子串检查，不解析 XML）。"""
+        xml = getattr(_DEVICE_GENERATOR, method)(**kwargs)
+        
+        for fragment in expected:
+            assert fragment in xml
+    
+    def test_network_device_mac_format(self):
+        """测试网络设备 MAC 地址格式（正则检查，不解析 XML）。"""
+        xml = _DEVICE_GENERATOR.generate_network_device("bridge0")
+        
+        assert re.search(r'<mac address="52:54:00(:[0-9a-f]{2}){3}"', xml)
+    
+    @pytest.mark.slow
     def test_generate_disk_device_xml(self):
         """测试磁盘设备 XML 生成。"""
-        generator = DeviceXMLGenerator()
-        
-        xml = generator.generate_disk_device(
+        _, root = _gen_and_parse(
+            "generate_disk_device",
             disk_path="/var/lib/libvirt/images/test.qcow2",
             target_dev="vdb",
             bus="virtio"
         )
-        
-        root = ET.fromstring(xml)
         assert root.tag == "disk"
         assert root.get("type") == "file"
         assert root.get("device") == "disk"
@@ -124,16 +220,14 @@ class TestDeviceXMLGenerator:
         assert target.get("dev") == "vdb"
         assert target.get("bus") == "virtio"
     
+    @pytest.mark.slow
     def test_generate_network_device_xml(self):
         """测试网络设备 XML 生成。"""
-        generator = DeviceXMLGenerator()
-        
-        xml = generator.generate_network_device(
+        _, root = _gen_and_parse(
+            "generate_network_device",
             network_name="bridge0",
             model="e1000"
         )
-        
-        root = ET.fromstring(xml)
         assert root.tag == "interface"
         assert root.get("type") == "network"
         
@@ -144,21 +238,17 @@ class TestDeviceXMLGenerator:
         assert model.get("type") == "e1000"
         
         # 验证 MAC 地址格式
-        mac = root.find("mac")
-        mac_addr = mac.get("address")
-        assert mac_addr.startswith("52:54:00:")
-        assert len(mac_addr.split(":")) == 6
+        mac_addr = root.find("mac").get("address")
+        assert re.fullmatch(r"52:54:00(:[0-9a-f]{2}){3}", mac_addr)
     
+    @pytest.mark.slow
     def test_generate_usb_device_xml(self):
         """测试 USB 设备 XML 生成。"""
-        generator = DeviceXMLGenerator()
-        
-        xml = generator.generate_usb_device(
+        _, root = _gen_and_parse(
+            "generate_usb_device",
             vendor_id="0x1234",
             product_id="0x5678"
         )
-        
-        root = ET.fromstring(xml)
         assert root.tag == "hostdev"
         assert root.get("mode") == "subsystem"
         assert root.get("type") == "usb"
@@ -170,16 +260,14 @@ class TestDeviceXMLGenerator:
         assert vendor.get("id") == "0x1234"
         assert product.get("id") == "0x5678"
     
+    @pytest.mark.slow
     def test_generate_cdrom_device_xml(self):
         """测试 CD-ROM 设备 XML 生成。"""
-        generator = DeviceXMLGenerator()
-        
-        xml = generator.generate_cdrom_device(
+        _, root = _gen_and_parse(
+            "generate_cdrom_device",
             iso_path="/var/lib/libvirt/images/ubuntu.iso",
             target_dev="hdc"
         )
-        
-        root = ET.fromstring(xml)
         assert root.tag == "disk"
         assert root.get("type") == "file"
         assert root.get("device") == "cdrom"
@@ -194,6 +282,59 @@ class TestDeviceXMLGenerator:
         # 验证只读属性
         readonly = root.find("readonly")
         assert readonly is not None
+    
+    def test_device_xml_has_no_declaration(self):
+        """测试设备 XML 不包含 XML 声明。"""
+        generator = DeviceXMLGenerator()
+        
+        outputs = [
+            generator.generate_disk_device("/var/lib/libvirt/images/test.qcow2"),
+            generator.generate_network_device(),
+            generator.generate_usb_device("0x1234", "0x5678"),
+            generator.generate_cdrom_device("/var/lib/libvirt/images/ubuntu.iso"),
+        ]
+        
+        for xml in outputs:
+            assert xml.startswith("<")
+            assert not xml.startswith("<?xml")
+    
+    def test_device_xml_pretty_flag(self):
+        """测试设备 XML 默认紧凑输出，pretty=True 时缩进。"""
+        generator = DeviceXMLGenerator()
+        
+        compact = generator.generate_disk_device("/var/lib/libvirt/images/test.qcow2")
+        pretty = generator.generate_disk_device("/var/lib/libvirt/images/test.qcow2", pretty=True)
+        
+        assert "\n" not in compact
+        assert "\n  <driver" in pretty
+        assert ET.canonicalize(compact) == ET.canonicalize(pretty, strip_text=True)
+    
+    def test_domain_tree_compact_output(self):
+        """测试元素树路径默认输出紧凑 XML（包括 <os> 片段）。"""
+        generator = DomainXMLGenerator()
+        params = DomainCreateParams(
+            name="compact-vm",
+            memory=1048576,
+            vcpus=1,
+            cdrom_path="/var/lib/libvirt/images/ubuntu.iso"
+        )
+        
+        xml = generator.generate(params, use_template=False)
+        
+        assert "\n" not in xml
+        assert "<os><type" in xml
+    
+    def test_network_device_gets_fresh_mac(self):
+        """测试重复生成网络设备时 MAC 地址不被缓存。"""
+        generator = DeviceXMLGenerator()
+        
+        macs = {
+            ET.fromstring(generator.generate_network_device("bridge0")).find("mac").get("address")
+            for _ in range(5)
+        }
+        
+        assert len(macs) > 1
+        assert all(mac.startswith("52:54:00:") for mac in macs)
 
 
 class TestLibvirtClientNewFeatures:
@@ -292,6 +433,18 @@ class TestParameterValidation:
                 memory=1048576,
                 vcpus=256  # 超过 128 最大值
             )
+    
+    @pytest.mark.parametrize(
+        "field",
+        ["name", "disk_path", "cdrom_path", "network", "os_type", "arch", "boot_device"],
+    )
+    def test_domain_create_params_rejects_control_characters(self, field):
+        """测试写入 XML 的字段拒绝控制字符。"""
+        values = {"name": "valid-vm", "memory": 1048576, "vcpus": 1}
+        values[field] = "bad\x00value"
+        
+        with pytest.raises(ValueError, match="control characters"):
+            DomainCreateParams(**values)
 
 
 @pytest.mark.integration
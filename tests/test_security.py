@@ -7,9 +7,34 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 
 from libvirt_mcp_server.config import Config, SecurityConfig
+from libvirt_mcp_server import security as security_module
 from libvirt_mcp_server.security import AuditLogger, SecurityManager
 
 
+VALID_DOMAIN_NAMES = [
+    "test-vm",
+    "my_virtual_machine",
+    "vm-123",
+    "production.web.server",
+]
+
+INVALID_DOMAIN_NAMES = [
+    pytest.param("", id="empty"),
+    pytest.param("a" * 300, id="too-long"),
+    pytest.param("../etc/passwd", id="path-traversal"),
+    pytest.param("vm\x00name", id="null-byte"),
+    pytest.param("vm\x01name", id="control-character"),
+    pytest.param("/etc/hosts", id="suspicious-path"),
+]
+
+INVALID_XML_SAMPLES = [
+    pytest.param("", id="empty"),
+    pytest.param('<!DOCTYPE foo [<!ENTITY xxe SYSTEM "file:///etc/passwd">]>', id="xxe"),
+    pytest.param('<domain><!ENTITY test SYSTEM "http://evil.com/"></domain>', id="external-entity"),
+    pytest.param("a" * (1024 * 1024 + 1), id="too-large"),
+]
+
+
 class TestAuditLogger:
     """Tests for AuditLogger."""
     
@@ -37,8 +62,9 @@ class TestAuditLogger:
                 client_info={"ip": "127.0.0.1"}
             )
             
-            # Verify log was called (async execution)
-            await asyncio.sleep(0.1)  # Allow executor to complete
+            # log_operation awaits the executor, so the entry is already written
+            mock_log.assert_called_once()
+            assert mock_log.call_args.kwargs["operation"] == "domain.start"
     
     @pytest.mark.asyncio
     async def test_log_security_event(self, audit_logger):
@@ -52,8 +78,9 @@ class TestAuditLogger:
                 user="test_user"
             )
             
-            # Verify log was called (async execution)
-            await asyncio.sleep(0.1)  # Allow executor to complete
+            # log_security_event awaits the executor, so the entry is already written
+            mock_log.assert_called_once()
+            assert mock_log.call_args.kwargs["event_type"] == "unauthorized_access"
     
     def test_sanitize_parameters(self, audit_logger):
         """Test parameter sanitization."""
@@ -96,6 +123,12 @@ class TestAuditLogger:
         assert summary["type"] == "list"
 
 
+@pytest.fixture(scope="module")
+def shared_security_manager():
+    """Create one security manager reused by every test in this module."""
+    return SecurityManager(Config())
+
+
 class TestSecurityManager:
     """Tests for SecurityManager."""
     
@@ -110,9 +143,10 @@ class TestSecurityManager:
         return config
     
     @pytest.fixture
-    def security_manager(self, config):
-        """Create security manager."""
-        return SecurityManager(config)
+    def security_manager(self, shared_security_manager, config):
+        """Reset the shared security manager onto this test's configuration."""
+        shared_security_manager.reset_state(config)
+        return shared_security_manager
     
     @pytest.mark.asyncio
     async def test_validate_operation_allowed(self, security_manager):
@@ -137,6 +171,23 @@ class TestSecurityManager:
         # Next operation should be rate limited
         result = await security_manager.validate_operation("domain.list", user="test_user")
         assert result is False
+        assert security_manager.operation_count("test_user:domain.list") == 5
+    
+    @pytest.mark.asyncio
+    async def test_rate_limit_window_slides(self, security_manager, monkeypatch):
+        """Test operations older than the window no longer count."""
+        now = [1000.0]
+        monkeypatch.setattr(security_module.time, "monotonic", lambda: now[0])
+        
+        for _ in range(5):
+            assert await security_manager.validate_operation("domain.list", user="test_user") is True
+        assert await security_manager.validate_operation("domain.list", user="test_user") is False
+        
+        now[0] += 59
+        assert await security_manager.validate_operation("domain.list", user="test_user") is False
+        
+        now[0] += 2
+        assert await security_manager.validate_operation("domain.list", user="test_user") is True
     
     @pytest.mark.asyncio
     async def test_operation_logging(self, security_manager):
@@ -147,7 +198,7 @@ class TestSecurityManager:
             user="test_user"
         )
         
-        assert isinstance(start_time, float)
+        assert isinstance(start_time, int)
         assert start_time > 0
         
         await security_manager.log_operation_complete(
@@ -159,40 +210,38 @@ class TestSecurityManager:
             user="test_user"
         )
         
-        # Verify operation count was decremented
-        async with security_manager._lock:
-            key = "test_user:domain.start"
-            assert security_manager._operation_counts.get(key, 0) == 0
+        # Logging alone never counts against the rate limit
+        assert security_manager.operation_count("test_user:domain.start") == 0
     
     @pytest.mark.asyncio
-    async def test_validate_domain_name_valid(self, security_manager):
-        """Test validation of valid domain names."""
-        valid_names = [
-            "test-vm",
-            "my_virtual_machine",
-            "vm-123",
-            "production.web.server"
-        ]
+    async def test_operation_start_event_uses_wall_clock(self, security_manager):
+        """Test that the operation_started event records wall-clock time."""
+        with patch.object(
+            security_manager.audit, "log_security_event", new=AsyncMock()
+        ) as log_event:
+            before = time.time()
+            await security_manager.log_operation_start(
+                operation="domain.start",
+                parameters={"name": "test-vm"},
+                user="test_user"
+            )
         
-        for name in valid_names:
-            result = await security_manager.validate_domain_name(name)
-            assert result is True, f"Valid name {name} was rejected"
+        details = log_event.call_args.kwargs["details"]
+        assert before <= details["start_time"] <= time.time()
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("name", VALID_DOMAIN_NAMES)
+    async def test_validate_domain_name_valid(self, security_manager, name):
+        """Test validation of valid domain names."""
+        result = await security_manager.validate_domain_name(name)
+        assert result is True, f"Valid name {name} was rejected"
     
     @pytest.mark.asyncio
-    async def test_validate_domain_name_invalid(self, security_manager):
+    @pytest.mark.parametrize("name", INVALID_DOMAIN_NAMES)
+    async def test_validate_domain_name_invalid(self, security_manager, name):
         """Test validation of invalid domain names."""
-        invalid_names = [
-            "",  # Empty
-            "a" * 300,  # Too long
-            "../etc/passwd",  # Path traversal
-            "vm\x00name",  # Null byte
-            "vm\x01name",  # Control character
-            "/etc/hosts",  # Suspicious path
-        ]
-        
-        for name in invalid_names:
-            result = await security_manager.validate_domain_name(name)
-            assert result is False, f"Invalid name {name} was accepted"
+        result = await security_manager.validate_domain_name(name)
+        assert result is False, f"Invalid name {name} was accepted"
     
     @pytest.mark.asyncio
     async def test_validate_xml_input_valid(self, security_manager):
@@ -209,18 +258,11 @@ class TestSecurityManager:
         assert result is True
     
     @pytest.mark.asyncio
-    async def test_validate_xml_input_invalid(self, security_manager):
+    @pytest.mark.parametrize("xml", INVALID_XML_SAMPLES)
+    async def test_validate_xml_input_invalid(self, security_manager, xml):
         """Test validation of invalid XML input."""
-        invalid_xml_samples = [
-            "",  # Empty
-            '<!DOCTYPE foo [<!ENTITY xxe SYSTEM "file:///etc/passwd">]>',  # XXE
-            '<domain><!ENTITY test SYSTEM "http://evil.com/"></domain>',  # External entity
-            "a" * (1024 * 1024 + 1),  # Too large
-        ]
-        
-        for xml in invalid_xml_samples:
-            result = await security_manager.validate_xml_input(xml)
-            assert result is False, f"Invalid XML was accepted: {xml[:50]}..."
+        result = await security_manager.validate_xml_input(xml)
+        assert result is False, f"Invalid XML was accepted: {xml[:50]}..."
     
     @pytest.mark.asyncio
     async def test_get_security_summary(self, security_manager):
@@ -234,12 +276,33 @@ class TestSecurityManager:
         assert "max_concurrent_ops" in summary
         assert "current_operation_counts" in summary
         assert "last_reset" in summary
+        assert "rate_limit_window" in summary
         
         assert summary["audit_enabled"] is True
         assert summary["auth_required"] is True
         assert summary["allowed_operations"] == 4  # Number of allowed operations
         assert summary["max_concurrent_ops"] == 5
-
+    
+    @pytest.mark.asyncio
+    async def test_security_summary_last_reset_tracks_oldest_operation(
+        self, security_manager, monkeypatch
+    ):
+        """Test that last_reset is the wall-clock time of the oldest counted operation."""
+        now = [1000.0]
+        monkeypatch.setattr(security_module.time, "monotonic", lambda: now[0])
+        monkeypatch.setattr(security_module.time, "time", lambda: now[0] + 5000.0)
+        
+        summary = await security_manager.get_security_summary()
+        assert summary["last_reset"] == 6000.0
+        
+        await security_manager.validate_operation("domain.list", user="test_user")
+        now[0] += 10
+        await security_manager.validate_operation("domain.info", user="test_user")
+        now[0] += 10
+        
+        summary = await security_manager.get_security_summary()
+        assert summary["last_reset"] == 6000.0
+        assert summary["rate_limit_window"] == security_module._RATE_LIMIT_WINDOW
 
 class TestSecurityManagerIntegration:
     """Integration tests for SecurityManager."""
@@ -254,9 +317,10 @@ class TestSecurityManagerIntegration:
         return config
     
     @pytest.fixture
-    def security_manager(self, config):
-        """Create security manager."""
-        return SecurityManager(config)
+    def security_manager(self, shared_security_manager, config):
+        """Reset the shared security manager onto this test's configuration."""
+        shared_security_manager.reset_state(config)
+        return shared_security_manager
     
     @pytest.mark.asyncio
     async def test_full_operation_workflow(self, security_manager):
@@ -285,7 +349,56 @@ class TestSecurityManagerIntegration:
             user="test_user"
         )
         
-        # Verify operation count was reset
-        async with security_manager._lock:
-            key = "test_user:domain.list"
-            assert security_manager._operation_counts.get(key, 0) == 0
+        # Completion leaves the operation in the sliding window
+        assert security_manager.operation_count("test_user:domain.list") == 1
+    
+    @pytest.mark.asyncio
+    async def test_long_operation_completion_keeps_newer_slots(self, security_manager, monkeypatch):
+        """Test that completing an expired operation does not free a newer one's slot."""
+        now = [1000.0]
+        monkeypatch.setattr(security_module.time, "monotonic", lambda: now[0])
+        
+        assert await security_manager.validate_operation("domain.list", user="test_user") is True
+        start_time = await security_manager.log_operation_start(
+            operation="domain.list",
+            parameters={},
+            user="test_user"
+        )
+        
+        now[0] += security_module._RATE_LIMIT_WINDOW + 1
+        assert await security_manager.validate_operation("domain.list", user="test_user") is True
+        assert await security_manager.validate_operation("domain.list", user="test_user") is True
+        
+        await security_manager.log_operation_complete(
+            operation="domain.list",
+            parameters={},
+            result={"domains": []},
+            success=True,
+            start_time=start_time,
+            user="test_user"
+        )
+        
+        assert security_manager.operation_count("test_user:domain.list") == 2
+        assert await security_manager.validate_operation("domain.list", user="test_user") is False
+    
+    @pytest.mark.asyncio
+    async def test_disabled_audit_skips_executor(self, security_manager):
+        """Test operation start/complete do not touch the audit executor when disabled."""
+        with patch.object(security_manager.audit, "_sync_log_security_event") as mock_event, \
+                patch.object(security_manager.audit, "_sync_log_operation") as mock_operation:
+            start_time = await security_manager.log_operation_start(
+                operation="domain.list",
+                parameters={},
+                user="test_user"
+            )
+            await security_manager.log_operation_complete(
+                operation="domain.list",
+                parameters={},
+                result={"domains": []},
+                success=True,
+                start_time=start_time,
+                user="test_user"
+            )
+        
+        mock_event.assert_not_called()
+        mock_operation.assert_not_called()